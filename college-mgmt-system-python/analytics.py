@@ -0,0 +1,163 @@
+# analytics.py
+# Grade statistics for a course, computed with NumPy.
+#
+# A course's grades come back from one query as parallel columns (assignment, submission, grade), which
+# are turned into arrays once; the per-assignment mean, median, percentiles and histogram are then
+# computed for every assignment at the same time with grouped array operations instead of Python loops.
+# Results are cached per course until a write that touches the course (see Database.grade_submission).
+import threading
+import time
+
+import numpy as np
+
+# one row per submission, plus one row with a NULL submission for every enrolled student who has not
+# handed the assignment in, so the missing count comes out of the same pass
+GRADES_QUERY = '''SELECT a.AssignmentID, s.ID, s.Grade FROM Assignments a
+                  JOIN Submissions s ON s.AssignmentID = a.AssignmentID
+                  WHERE a.CourseID = ?
+                  UNION ALL
+                  SELECT a.AssignmentID, NULL, NULL FROM Assignments a
+                  JOIN Enrollments e ON e.CourseID = a.CourseID
+                  JOIN Users u ON u.ID = e.StudentID
+                  WHERE a.CourseID = ? AND NOT EXISTS (
+                      SELECT 1 FROM Submissions s WHERE s.AssignmentID = a.AssignmentID AND s.SubmitterID = u.Username)'''
+PERCENTILES = (10, 25, 50, 75, 90)
+BINS = np.arange(0, 101, 10)  # grade histogram edges; the last bin is 90-100 inclusive
+CACHE_TTL = 30.0  # seconds, bounds staleness from other clients' writes like the client's query cache
+
+
+# Purpose: turn result rows into (assignment ids, submission ids, grades) arrays; NULLs become -1 / NaN
+def to_columns(rows: list) -> tuple:
+    count = len(rows)
+    assignments = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+    submissions = np.fromiter((-1 if row[1] is None else row[1] for row in rows), dtype=np.int64, count=count)
+    grades = np.fromiter((np.nan if row[2] is None else row[2] for row in rows), dtype=np.float64, count=count)
+    return assignments, submissions, grades
+
+
+# Purpose: per-group percentiles of values already sorted by (group, value); rows of NaN for empty groups
+def grouped_percentiles(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, percentiles) -> np.ndarray:
+    result = np.full((len(counts), len(percentiles)), np.nan)
+    filled = counts > 0
+    if not filled.any():
+        return result
+    # linear interpolation between the closest ranks, the same as np.percentile's default
+    position = (counts[filled, None] - 1) * (np.asarray(percentiles, dtype=np.float64) / 100)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts[filled, None] - 1)
+    base = starts[filled, None]
+    weight = position - lower
+    result[filled] = values[base + lower] * (1 - weight) + values[base + upper] * weight
+    return result
+
+
+# Purpose: statistics for every assignment at once plus the whole course; rows come from GRADES_QUERY
+def summarize(assignment_ids: list, rows: list) -> dict:
+    order = np.asarray(assignment_ids, dtype=np.int64)
+    assignments, submissions, grades = to_columns(rows)
+    # map each row to its assignment's position in order, dropping rows for assignments not listed
+    sorter = np.argsort(order)
+    slots = np.searchsorted(order, assignments, sorter=sorter)
+    known = slots < len(order)
+    known[known] = order[sorter[slots[known]]] == assignments[known]
+    group = sorter[slots[known]]
+    submissions, grades = submissions[known], grades[known]
+    groups = len(order)
+
+    submitted = submissions >= 0
+    graded = ~np.isnan(grades)
+    graded_group = group[graded]
+    graded_values = grades[graded]
+    counts = np.bincount(graded_group, minlength=groups)
+    totals = np.bincount(graded_group, weights=graded_values, minlength=groups)
+    squares = np.bincount(graded_group, weights=graded_values ** 2, minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = totals / counts
+        stds = np.sqrt(np.maximum(squares / counts - means ** 2, 0))
+
+    # sort by (assignment, grade) once; each assignment's grades are then one contiguous sorted run
+    by_group = np.lexsort((graded_values, graded_group))
+    sorted_values = graded_values[by_group]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])) if groups else np.zeros(0, dtype=np.int64)
+    percentiles = grouped_percentiles(sorted_values, starts, counts, PERCENTILES)
+    minimums = np.full(groups, np.nan)
+    maximums = np.full(groups, np.nan)
+    filled = counts > 0
+    minimums[filled] = sorted_values[starts[filled]]
+    maximums[filled] = sorted_values[starts[filled] + counts[filled] - 1]
+
+    bins = np.clip(np.searchsorted(BINS, graded_values, side='right') - 1, 0, len(BINS) - 2)
+    histograms = np.bincount(graded_group * (len(BINS) - 1) + bins,
+                             minlength=groups * (len(BINS) - 1)).reshape(groups, len(BINS) - 1)
+
+    course_percentiles = np.percentile(graded_values, PERCENTILES) if graded_values.size else \
+        np.full(len(PERCENTILES), np.nan)
+    return {
+        'assignment_ids': order,
+        'submitted': np.bincount(group[submitted], minlength=groups),
+        'graded': counts,
+        'ungraded': np.bincount(group[submitted & ~graded], minlength=groups),
+        'missing': np.bincount(group[~submitted], minlength=groups),
+        'mean': means,
+        'std': stds,
+        'min': minimums,
+        'max': maximums,
+        'percentiles': percentiles,  # one row per assignment, one column per PERCENTILES entry
+        'histogram': histograms,  # one row per assignment, one column per BINS interval
+        'course': {
+            'graded': int(graded_values.size),
+            'missing': int((~submitted).sum()),
+            'mean': float(graded_values.mean()) if graded_values.size else float('nan'),
+            'percentiles': course_percentiles,
+            'histogram': histograms.sum(axis=0),
+        },
+        'submission_ids': np.unique(submissions[submitted]),
+    }
+
+
+class GradeAnalytics:
+    def __init__(self, db, ttl: float = CACHE_TTL) -> None:
+        self.db = db
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.results = {}  # course id -> (computed at, summary)
+
+    # Purpose: the summary for a course, from the cache unless a write to the course has happened since
+    def course(self, course_id) -> dict:
+        with self.lock:
+            cached = self.results.get(course_id)
+        if cached and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+        assignments = self.db.get_assignments_by_course(course_id) or []
+        rows = self.db.send_query(GRADES_QUERY, (course_id, course_id))
+        if isinstance(rows, str):
+            raise RuntimeError(rows)
+        summary = summarize([assignment[0] for assignment in assignments], rows or [])
+        summary['names'] = [assignment[1] for assignment in assignments]
+        with self.lock:
+            self.results[course_id] = (time.monotonic(), summary)
+        return summary
+
+    # Purpose: forget a course's summary; with no course, forget all of them
+    def invalidate(self, course_id=None) -> None:
+        with self.lock:
+            if course_id is None:
+                self.results.clear()
+            else:
+                self.results.pop(course_id, None)
+
+    # Purpose: forget whichever cached course a regraded submission belongs to
+    def submission_changed(self, submission_id) -> None:
+        with self.lock:
+            for course_id, (_, summary) in list(self.results.items()):
+                ids = summary['submission_ids']
+                position = np.searchsorted(ids, int(submission_id))
+                if position < len(ids) and ids[position] == int(submission_id):
+                    del self.results[course_id]
+
+    # Purpose: forget whichever cached course an assignment belongs to, after a submission is added to it
+    def assignment_changed(self, assignment_id) -> None:
+        with self.lock:
+            for course_id, (_, summary) in list(self.results.items()):
+                if int(assignment_id) in summary['assignment_ids']:
+                    del self.results[course_id]
@@ -0,0 +1,211 @@
+# generate_dataset.py
+# Deterministic synthetic collegeMGMTsystem.db for benchmarks and index work.
+#
+# The same --seed always gives the same database. The defaults are production sized (50k users, 2k courses,
+# 40k assignments, about 2M submissions) and take well under a minute: rows are generated in batches and
+# written with executemany inside a few large transactions, journaling off, and the indexes from
+# migrations.py are built once at the end instead of being updated row by row. Shapes are skewed the way
+# real data is: a few large intro courses and many small ones, some teachers with heavy loads, students who
+# skip more assignments than others, grades clustered in the 70s-90s, and the latest assignments ungraded.
+#
+#     python benchmarks/generate_dataset.py --output large.db
+#     python benchmarks/load_test.py --dataset large.db --students 500
+#
+# Usernames are student0..N and teacher0..M, all with PASSWORD, so load_test.py can log in as anyone.
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrations  # noqa: E402  (needs the client directory on the path)
+
+OUTPUT = 'collegeMGMTsystem-synthetic.db'
+PASSWORD = 'load-test'
+BATCH = 50000  # rows per executemany
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Carlos', 'Karen',
+               'Daniel', 'Priya', 'Matthew', 'Nancy', 'Anthony', 'Lisa', 'Wei', 'Fatima', 'Kevin', 'Aisha']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+              'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+              'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Nguyen', 'Patel', 'Kim']
+SUBJECTS = ['ACCT', 'BIOL', 'CHEM', 'COMM', 'CSAS', 'ECON', 'ENGL', 'FINA', 'HIST', 'MATH', 'NURS', 'PHIL', 'PHYS',
+            'POLS', 'PSYC', 'RELS', 'SOCI', 'SPAN', 'THEO', 'DIPL']
+BUILDINGS = ['AH', 'CO', 'FH', 'JH', 'MH', 'SH', 'WH']
+WORK = ['Lab report', 'Problem set', 'Essay', 'Quiz', 'Reading response', 'Project milestone', 'Case study']
+ANSWERS = ['See attached work.', 'My answer is in the document below.', 'Submitted for review, thank you.',
+           'Final draft with the corrections from class.', 'Worked with my study group on parts 2 and 3.']
+
+
+def person(rng: random.Random) -> tuple:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    dob = f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(1960, 2007)}"
+    phone = f"{rng.randint(200, 999)}{rng.randint(0, 9999999):07d}"
+    return first, last, dob, phone
+
+
+# Purpose: a write-only connection tuned for one bulk load into a fresh file
+def create(path: str) -> sqlite3.Connection:
+    db_connection = sqlite3.connect(path, isolation_level=None)
+    db_connection.execute('PRAGMA journal_mode=OFF')  # a failed run just gets generated again
+    db_connection.execute('PRAGMA synchronous=OFF')
+    db_connection.execute('PRAGMA cache_size=-200000')
+    # tables only, so the bulk inserts don't maintain indexes; the rest of the migrations run at the end
+    base_version, _, statements = migrations.MIGRATIONS[0]
+    for statement in statements:
+        db_connection.execute(statement)
+    db_connection.execute(f'PRAGMA user_version = {base_version}')
+    return db_connection
+
+
+def insert(db_connection: sqlite3.Connection, statement: str, rows) -> int:
+    count = 0
+    batch = []
+    db_connection.execute('BEGIN')
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH:
+            db_connection.executemany(statement, batch)
+            count += len(batch)
+            batch = []
+    db_connection.executemany(statement, batch)
+    db_connection.execute('COMMIT')
+    return count + len(batch)
+
+
+# Purpose: fill a new database at path; returns {table: rows written}
+def generate(path: str, users: int, courses: int, assignments: int, submissions: int, seed: int,
+             teacher_share: float = 0.04, courses_per_student: float = 4.5, log=print) -> dict:
+    rng = random.Random(seed)
+    db_connection = create(path)
+    counts = {}
+
+    # users: IDs are assigned in insert order, so they are known without reading them back
+    teachers = max(1, int(users * teacher_share))
+    students = users - teachers
+
+    def user_rows():
+        for index in range(users):
+            privilege, number = ('Teacher', index - students) if index >= students else ('Student', index)
+            first, last, dob, phone = person(rng)
+            username = f'{privilege.lower()}{number}'
+            yield (username, PASSWORD, privilege, dob, f'{username}@shu.edu', phone, first, last)
+    started = time.perf_counter()
+    counts['Users'] = insert(db_connection, '''INSERT INTO Users (Username, Password, Privilege, DOB, Email, Phone,
+                             FName, LName) VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', user_rows())
+    student_ids = range(1, students + 1)
+
+    # courses: teaching loads are skewed, a few professors carry many sections
+    teacher_weights = [rng.paretovariate(2.0) for _ in range(teachers)]
+    professors = rng.choices(range(teachers), weights=teacher_weights, k=courses)
+
+    def course_rows():
+        for index in range(courses):
+            name = f"{rng.choice(SUBJECTS)} {rng.randint(1, 4)}{rng.randint(0, 9)}{rng.randint(1, 9):02d}-{index % 9 + 1:02d}"
+            room = f"{rng.choice(BUILDINGS)} {rng.randint(1, 4)}{rng.randint(0, 30):02d}"
+            yield (name, f'teacher{professors[index]}', room)
+    counts['Courses'] = insert(db_connection, 'INSERT INTO Courses (CourseName, Professor, RoomNumber) VALUES (?, ?, ?)',
+                               course_rows())
+
+    # enrollments: course popularity follows a power law, so intro courses fill up and electives stay small
+    popularity = [rng.paretovariate(1.2) for _ in range(courses)]
+    cumulative = []
+    total = 0.0
+    for weight in popularity:
+        total += weight
+        cumulative.append(total)
+    rosters = [[] for _ in range(courses)]  # course index -> enrolled student IDs
+
+    def enrollment_rows():
+        for student_id in student_ids:
+            wanted = min(courses, max(1, round(rng.gauss(courses_per_student, 1.2))))
+            chosen = set()
+            while len(chosen) < wanted:
+                chosen.update(rng.choices(range(courses), cum_weights=cumulative, k=wanted - len(chosen)))
+            for course in chosen:
+                rosters[course].append(student_id)
+                yield (course + 1, student_id)
+    counts['Enrollments'] = insert(db_connection, 'INSERT INTO Enrollments (CourseID, StudentID) VALUES (?, ?)',
+                                   enrollment_rows())
+
+    # assignments: spread over courses around the mean, at least one each
+    per_course = [1] * courses
+    for course in rng.choices(range(courses), k=max(0, assignments - courses)):
+        per_course[course] += 1
+
+    def assignment_rows():
+        for course in range(courses):
+            for number in range(1, per_course[course] + 1):
+                yield (f"{rng.choice(WORK)} {number}", f"Due week {min(number, 15)}. Submit through the portal.",
+                       course + 1)
+    counts['Assignments'] = insert(db_connection, 'INSERT INTO Assignments (Name, Description, CourseID) VALUES (?, ?, ?)',
+                                   assignment_rows())
+
+    # submissions: each enrolled student hands in each assignment with a chance set by how diligent they are,
+    # scaled so the total lands near the target; the newest assignments of every course are still ungraded
+    diligence = {student_id: min(1.0, max(0.05, rng.gauss(0.85, 0.15))) for student_id in student_ids}
+    expected = sum(per_course[course] * sum(diligence[student_id] for student_id in rosters[course])
+                   for course in range(courses))
+    rate = submissions / expected if expected else 0.0
+    ability = {student_id: rng.gauss(0, 8) for student_id in student_ids}
+
+    def submission_rows():
+        random_value, gauss, answers = rng.random, rng.gauss, ANSWERS
+        assignment_id = 0
+        for course in range(courses):
+            roster = [(f'student{student_id - 1}', diligence[student_id] * rate, ability[student_id])
+                      for student_id in rosters[course]]
+            count = per_course[course]
+            for number in range(1, count + 1):
+                assignment_id += 1
+                graded = number <= count - max(1, count // 10)
+                difficulty = gauss(82, 5)
+                for username, chance, skill in roster:
+                    if random_value() >= chance:
+                        continue
+                    grade = min(100, max(0, round(gauss(difficulty + skill, 9)))) if graded else None
+                    yield (assignment_id, username, answers[int(random_value() * len(answers))], grade)
+    counts['Submissions'] = insert(db_connection, '''INSERT INTO Submissions (AssignmentID, SubmitterID, Body, Grade)
+                                   VALUES (?, ?, ?, ?)''', submission_rows())
+    log(f"rows written in {time.perf_counter() - started:.1f}s: "
+        + ', '.join(f"{table} {count:,}" for table, count in counts.items()))
+
+    started = time.perf_counter()
+    migrations.migrate_connection(db_connection)
+    db_connection.execute('ANALYZE')  # give the query planner real statistics for the skewed tables
+    db_connection.close()
+    log(f"indexes built and analyzed in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Generate a large synthetic college management database')
+    parser.add_argument('--output', default=OUTPUT, help='database file to create')
+    parser.add_argument('--force', action='store_true', help='replace the output file if it exists')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--users', type=int, default=50000)
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--assignments', type=int, default=40000)
+    parser.add_argument('--submissions', type=int, default=2000000, help='target; the result lands close to it')
+    parser.add_argument('--teacher-share', type=float, default=0.04, help='fraction of users who are teachers')
+    parser.add_argument('--courses-per-student', type=float, default=4.5, help='mean enrollments per student')
+    args = parser.parse_args()
+    if args.courses > args.assignments:
+        parser.error('every course gets at least one assignment, so --assignments must be at least --courses')
+
+    if os.path.exists(args.output):
+        if not args.force:
+            parser.error(f"{args.output} exists, pass --force to replace it")
+        os.remove(args.output)
+    started = time.perf_counter()
+    generate(args.output, args.users, args.courses, args.assignments, args.submissions, args.seed,
+             args.teacher_share, args.courses_per_student)
+    print(f"{args.output}: {os.path.getsize(args.output) / 1e6:.0f} MB in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+# load_test.py
+# Headless load test: N simulated students and teachers drive the client's Database API against a server.
+#
+# By default a server is started on a small freshly seeded database (or a copy of --dataset, e.g. one made by
+# generate_dataset.py), so runs are repeatable and the real collegeMGMTsystem.db is never touched. Every client
+# starts at the same moment (a semester-start login storm), then loops over its script until --duration runs out:
+#   student: login, view enrolled courses, open a course's assignments, submit one, view own submissions
+#   teacher: login, list courses, page through a course's submissions, grade a few, load the grade stats
+# Reports throughput, latency percentiles and errors per operation, and can save them for later comparison:
+#
+#     python benchmarks/load_test.py --students 200 --teachers 10 --duration 20 --json after.json --compare before.json
+import argparse
+import json
+import os
+import random
+import runpy
+import shutil
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT = os.path.join(CLIENT_DIR, 'college-mgmt-system.py')
+SERVER = os.path.join(CLIENT_DIR, 'college-mgmt-system-server.py')
+sys.path.insert(0, CLIENT_DIR)
+
+import bulk_import  # noqa: E402  (needs CLIENT_DIR on the path)
+import migrations  # noqa: E402
+from generate_dataset import PASSWORD  # noqa: E402  generated databases use the same password
+PORT = 65433  # not the default, so a running development server is left alone
+
+
+# Purpose: build a database with `students` students, `teachers` teachers each teaching `courses` courses
+# with `assignments` assignments, and every student enrolled in `enrollments` random courses
+def seed(path: str, students: int, teachers: int, courses: int, assignments: int, enrollments: int,
+         rng: random.Random) -> None:
+    db_connection = sqlite3.connect(path)
+    migrations.migrate_connection(db_connection)
+    users = [{'username': f'student{i}', 'password': PASSWORD, 'privilege': 'Student'} for i in range(students)]
+    users += [{'username': f'teacher{i}', 'password': PASSWORD, 'privilege': 'Teacher'} for i in range(teachers)]
+    bulk_import.import_users(db_connection, enumerate(users, start=2))
+    course_rows = [{'course_name': f'course{t}_{c}', 'professor': f'teacher{t}', 'room_number': str(100 + c)}
+                   for t in range(teachers) for c in range(courses)]
+    bulk_import.import_courses(db_connection, enumerate(course_rows, start=2))
+    names = [row['course_name'] for row in course_rows]
+    enrollment_rows = [{'username': f'student{i}', 'course_name': name}
+                       for i in range(students) for name in rng.sample(names, min(enrollments, len(names)))]
+    bulk_import.import_enrollments(db_connection, enumerate(enrollment_rows, start=2))
+    with db_connection:
+        db_connection.executemany('INSERT INTO Assignments (Name, Description, CourseID) VALUES (?, ?, ?)',
+                                  [(f'hw{a}_{course_id}', 'load test', course_id)
+                                   for (course_id,) in db_connection.execute('SELECT CourseID FROM Courses')
+                                   for a in range(assignments)])
+    db_connection.close()
+
+
+# Purpose: start the server in its own directory on a copy of the seeded database; returns the process
+def start_server(workdir: str, port: int, server_args: list) -> subprocess.Popen:
+    log = open(os.path.join(workdir, 'server.log'), 'w')
+    server = subprocess.Popen([sys.executable, SERVER, '--port', str(port)] + server_args, cwd=workdir,
+                              stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited, see {log.name}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("server did not start listening within 10 seconds")
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latencies = {}  # operation -> [seconds]
+        self.errors = {}  # operation -> count
+        self.samples = {}  # operation -> first error message, to show what went wrong
+
+    # Purpose: time one operation; a raised exception or an error string from the server counts as an error
+    def run(self, operation: str, call, *args):
+        started = time.perf_counter()
+        try:
+            result = call(*args)
+            failed = isinstance(result, str) and result != 'Success'
+            message = result if failed else None
+        except Exception as e:
+            result, failed, message = None, True, f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.latencies.setdefault(operation, []).append(elapsed)
+            if failed:
+                self.errors[operation] = self.errors.get(operation, 0) + 1
+                self.samples.setdefault(operation, message)
+        return None if failed else result
+
+
+def student_script(db, recorder: Recorder, username: str, rng: random.Random) -> None:
+    session = recorder.run('login', db.authenticate_user, username, PASSWORD)
+    if session is None:
+        return
+    courses = recorder.run('enrolled_courses', db.get_enrolled_courses_by_student) or []
+    if courses:
+        course_id = rng.choice(courses)[0]
+        assignments = recorder.run('course_assignments', db.get_assignments_by_course, course_id) or []
+        if assignments:
+            recorder.run('submit_assignment', db.add_submission, rng.choice(assignments)[0],
+                         f"answer {rng.random()}")
+    recorder.run('own_submissions', db.get_student_submissions_page, 0)
+    recorder.run('logout', db.logout)
+
+
+def teacher_script(db, recorder: Recorder, username: str, rng: random.Random) -> None:
+    session = recorder.run('login', db.authenticate_user, username, PASSWORD)
+    if session is None:
+        return
+    courses = recorder.run('teacher_courses', db.get_courses_by_professor) or []
+    if courses:
+        course_id = rng.choice(courses)[0]
+        submissions = recorder.run('course_submissions', db.get_course_submissions_page, course_id, 0) or []
+        for submission in rng.sample(submissions, min(5, len(submissions))):
+            recorder.run('grade_submission', db.grade_submission, submission[0], rng.randint(50, 100))
+        recorder.run('grade_stats', db.get_assignment_grade_stats, course_id)
+    recorder.run('logout', db.logout)
+
+
+# Purpose: one simulated user: connect, wait for everyone, then repeat the script until the deadline
+def simulate(Database, port: int, script, username: str, recorder: Recorder, start: threading.Barrier,
+             duration: float, cache_size: int, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    db = recorder.run('connect', lambda: Database(port=port, pool_size=1, cache_size=cache_size))
+    start.wait()
+    if db is None:
+        return
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        script(db, recorder, username, rng)
+    db.close_connection()
+
+
+# Purpose: percentile of sorted values by linear interpolation between closest ranks
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    operations = {}
+    total = errors = 0
+    for operation, latencies in sorted(recorder.latencies.items()):
+        latencies = sorted(latencies)
+        failed = recorder.errors.get(operation, 0)
+        total += len(latencies)
+        errors += failed
+        operations[operation] = {
+            'count': len(latencies), 'errors': failed, 'error_rate': failed / len(latencies),
+            'throughput': len(latencies) / elapsed, 'mean_ms': statistics.fmean(latencies) * 1000,
+            'p50_ms': percentile(latencies, 50) * 1000, 'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000, 'max_ms': latencies[-1] * 1000,
+        }
+        if operation in recorder.samples:
+            operations[operation]['first_error'] = recorder.samples[operation]
+    return {'elapsed': elapsed, 'operations_total': total, 'errors_total': errors,
+            'throughput': total / elapsed, 'error_rate': errors / total if total else 0.0, 'operations': operations}
+
+
+def report(results: dict, baseline: dict = None) -> None:
+    summary = results['summary']
+    print(f"{summary['operations_total']} operations in {summary['elapsed']:.1f}s: "
+          f"{summary['throughput']:.0f} ops/s, {summary['error_rate']:.2%} errors")
+    print(f"  {'operation':<20}{'count':>8}{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for operation, stats in summary['operations'].items():
+        line = (f"  {operation:<20}{stats['count']:>8}{stats['throughput']:>9.1f}{stats['p50_ms']:>9.2f}"
+                f"{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['max_ms']:>9.1f}{stats['errors']:>8}")
+        before = (baseline or {}).get('summary', {}).get('operations', {}).get(operation)
+        if before and before['p95_ms']:
+            line += f"   p95 {(stats['p95_ms'] / before['p95_ms'] - 1):+.0%} vs baseline"
+        print(line)
+        if 'first_error' in stats:
+            print(f"      first error: {stats['first_error']}")
+    if baseline:
+        change = summary['throughput'] / baseline['summary']['throughput'] - 1
+        print(f"throughput {change:+.1%} vs baseline ({baseline['summary']['throughput']:.0f} ops/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Simulated concurrent clients against the database server')
+    parser.add_argument('--students', type=int, default=50, help='simulated students')
+    parser.add_argument('--teachers', type=int, default=5, help='simulated teachers')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds each client keeps working')
+    parser.add_argument('--dataset', metavar='PATH',
+                        help='run on a copy of this database (from generate_dataset.py) instead of seeding one')
+    parser.add_argument('--courses', type=int, default=4, help='courses per teacher in the seeded database')
+    parser.add_argument('--assignments', type=int, default=5, help='assignments per course')
+    parser.add_argument('--enrollments', type=int, default=3, help='courses each student is enrolled in')
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="each client's query cache; 0 (the default) sends every read to the server")
+    parser.add_argument('--seed', type=int, default=1, help='random seed for the data and the scripts')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--no-server', action='store_true',
+                        help='use a server already running on --port (its database must hold the load-test users)')
+    parser.add_argument('--server-arg', action='append', default=[], metavar='ARG',
+                        help='extra argument for the spawned server, e.g. --server-arg=--engine=async (repeatable)')
+    parser.add_argument('--json', metavar='PATH', help='write the results here')
+    parser.add_argument('--compare', metavar='PATH', help='earlier --json results to compare against')
+    args = parser.parse_args()
+
+    Database = runpy.run_path(CLIENT, run_name='load_test')['Database']
+    rng = random.Random(args.seed)
+    workdir = tempfile.mkdtemp(prefix='cms-load-')
+    server = None
+    try:
+        if not args.no_server:
+            if args.dataset:
+                shutil.copyfile(args.dataset, os.path.join(workdir, 'collegeMGMTsystem.db'))
+            else:
+                seed(os.path.join(workdir, 'collegeMGMTsystem.db'), args.students, args.teachers, args.courses,
+                     args.assignments, args.enrollments, rng)
+            server = start_server(workdir, args.port, args.server_arg)
+
+        recorder = Recorder()
+        users = [(student_script, f'student{i}') for i in range(args.students)] + \
+                [(teacher_script, f'teacher{i}') for i in range(args.teachers)]
+        start = threading.Barrier(len(users) + 1)
+        threads = [threading.Thread(target=simulate, daemon=True,
+                                    args=(Database, args.port, script, username, recorder, start, args.duration,
+                                          args.cache_size, rng.randrange(2 ** 32)))
+                   for script, username in users]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {'config': {key: value for key, value in vars(args).items() if key not in ('json', 'compare')},
+               'summary': summarize(recorder, elapsed)}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+    report(results, baseline)
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
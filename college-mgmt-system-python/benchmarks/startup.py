@@ -0,0 +1,76 @@
+# startup.py
+# Import-time report for the client, built on `python -X importtime`.
+#
+# Loads college-mgmt-system.py the way `python college-mgmt-system.py` would, minus the __main__
+# block, in a fresh interpreter, then reports the total and the slowest top-level imports. Exits
+# non-zero if a module that should be imported lazily shows up at startup, or if --budget-ms is
+# exceeded, so it can guard against regressions:
+#
+#     python benchmarks/startup.py --runs 5 --budget-ms 400 --json startup.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT = os.path.join(CLIENT_DIR, 'college-mgmt-system.py')
+# only needed once the user opens the grades graph, the grade report or the staff directory
+LAZY_MODULES = ('matplotlib', 'numpy', 'analytics', 'requests', 'bs4', 'faculty')
+LOAD_CLIENT = f"import runpy; runpy.run_path({CLIENT!r}, run_name='startup_check')"
+
+
+# Purpose: run code once in a fresh interpreter and return {top-level package: cumulative us}
+def measure_once(code: str = LOAD_CLIENT) -> dict:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=CLIENT_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"loading the client failed:\n{result.stderr[-2000:]}")
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = len(name) - len(name.lstrip())
+        if depth == 1:  # a top-level import; its cumulative time includes everything it pulled in
+            packages[name.strip()] = int(cumulative)
+    return packages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Client startup import-time report')
+    parser.add_argument('--runs', type=int, default=3, help='fresh interpreters to measure, the median is reported')
+    parser.add_argument('--top', type=int, default=15, help='how many of the slowest imports to list')
+    parser.add_argument('--budget-ms', type=float, help='fail if the median total import time exceeds this')
+    parser.add_argument('--json', metavar='PATH', help='also write the report to this file')
+    args = parser.parse_args()
+
+    interpreter = measure_once('pass')  # site, encodings, ... are loaded before the client runs at all
+    runs = [{name: us for name, us in measure_once().items() if name not in interpreter} for _ in range(args.runs)]
+    names = set().union(*runs)
+    median_us = {name: statistics.median(run.get(name, 0) for run in runs) for name in names}
+    total_ms = statistics.median(sum(run.values()) for run in runs) / 1000
+    eager = sorted(name for name in names if name.split('.')[0] in LAZY_MODULES)
+
+    print(f"client import time: {total_ms:.1f} ms (median of {args.runs})")
+    for name, us in sorted(median_us.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, 'w') as report:
+            json.dump({'total_ms': total_ms, 'runs': args.runs, 'eager_lazy_modules': eager,
+                       'imports_ms': {name: us / 1000 for name, us in median_us.items()}}, report, indent=2)
+
+    failed = False
+    if eager:
+        print(f"FAIL: should be imported lazily but loaded at startup: {', '.join(eager)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"FAIL: {total_ms:.1f} ms is over the {args.budget_ms:.1f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
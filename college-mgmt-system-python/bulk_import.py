@@ -0,0 +1,210 @@
+# bulk_import.py
+# Load users, courses and enrollments from CSV files straight into collegeMGMTsystem.db.
+#
+# Files are streamed a chunk at a time. Usernames and course names are resolved to IDs from maps built
+# once per load rather than per row, and each chunk goes in with one executemany in one transaction.
+# A row that fails validation is reported with its line number and skipped; the rest of the file still
+# loads. It works on the database file directly, so it can run next to the server (WAL lets readers carry
+# on while a chunk commits):
+#
+#     python bulk_import.py --users users.csv --courses courses.csv --enrollments enrollments.csv
+#
+# Expected headers (extra columns are ignored):
+#   users:       username,password,privilege[,dob,email,phone,fname,lname]
+#   courses:     course_name,professor,room_number
+#   enrollments: username,course_name
+import argparse
+import csv
+import itertools
+import sqlite3
+import sys
+import time
+
+import migrations
+
+DB_PATH = 'collegeMGMTsystem.db'
+CHUNK_SIZE = 10000  # rows per executemany / transaction
+PRIVILEGES = ('Student', 'Teacher')
+USER_COLUMNS = ('username', 'password', 'privilege', 'dob', 'email', 'phone', 'fname', 'lname')
+
+INSERT_USER = '''INSERT INTO Users (Username, Password, Privilege, DOB, Email, Phone, FName, LName)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+INSERT_COURSE = 'INSERT INTO Courses (CourseName, Professor, RoomNumber) VALUES (?, ?, ?)'
+INSERT_ENROLLMENT = 'INSERT INTO Enrollments (CourseID, StudentID) VALUES (?, ?)'
+
+
+class ImportReport:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.inserted = 0
+        self.errors = []  # (line number, message)
+        self.seconds = 0.0
+
+    def error(self, line: int, message: str) -> None:
+        self.errors.append((line, message))
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.inserted} inserted, {len(self.errors)} rejected in {self.seconds:.2f}s"
+
+
+# Purpose: yield (line number, row dict) from a CSV file without reading it all into memory
+def read_csv(path: str):
+    with open(path, newline='', encoding='utf-8-sig') as csv_file:
+        reader = csv.DictReader(csv_file)
+        if reader.fieldnames is None:
+            return
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        for row in reader:
+            yield reader.line_num, {key: (value or '').strip() for key, value in row.items() if key is not None}
+
+
+# Purpose: insert one chunk; if executemany hits a constraint, retry row by row so only the bad rows are lost
+def insert_chunk(db_connection: sqlite3.Connection, statement: str, chunk: list, report: ImportReport) -> None:
+    if not chunk:
+        return
+    try:
+        with db_connection:
+            db_connection.executemany(statement, [values for _, values in chunk])
+        report.inserted += len(chunk)
+        return
+    except sqlite3.IntegrityError:
+        pass  # the whole chunk was rolled back
+    with db_connection:
+        db_connection.execute('BEGIN')
+        for line, values in chunk:
+            db_connection.execute('SAVEPOINT import_row')
+            try:
+                db_connection.execute(statement, values)
+                report.inserted += 1
+            except sqlite3.IntegrityError as e:
+                db_connection.execute('ROLLBACK TO import_row')
+                report.error(line, str(e))
+            db_connection.execute('RELEASE import_row')
+
+
+# Purpose: run check(line, row) -> values or None (rejected) over the rows and insert the valid ones in chunks
+def load(db_connection: sqlite3.Connection, rows, statement: str, check, report: ImportReport,
+         chunk_size: int = CHUNK_SIZE) -> ImportReport:
+    started = time.perf_counter()
+    rows = iter(rows)
+    while True:
+        chunk = []
+        read = 0
+        for line, row in itertools.islice(rows, chunk_size):
+            read += 1
+            values = check(line, row)
+            if values is not None:
+                chunk.append((line, values))
+        insert_chunk(db_connection, statement, chunk, report)
+        if read < chunk_size:
+            break
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+# Purpose: load users; usernames already in the database or repeated in the file are rejected
+def import_users(db_connection: sqlite3.Connection, rows, chunk_size: int = CHUNK_SIZE) -> ImportReport:
+    report = ImportReport('users')
+    taken = {username for (username,) in db_connection.execute('SELECT Username FROM Users')}
+
+    def check(line: int, row: dict):
+        username = row.get('username', '').replace(' ', '')
+        if not username or not row.get('password'):
+            report.error(line, 'username and password are required')
+            return None
+        privilege = row.get('privilege', '').capitalize()
+        if privilege not in PRIVILEGES:
+            report.error(line, f"privilege must be one of {', '.join(PRIVILEGES)}")
+            return None
+        if username in taken:
+            report.error(line, f"username {username!r} already exists")
+            return None
+        taken.add(username)
+        values = [row.get(column, '') for column in USER_COLUMNS]
+        values[0], values[2] = username, privilege
+        return values
+
+    return load(db_connection, rows, INSERT_USER, check, report, chunk_size)
+
+
+# Purpose: load courses; the professor must be a Teacher, including ones imported earlier in the same run
+def import_courses(db_connection: sqlite3.Connection, rows, chunk_size: int = CHUNK_SIZE) -> ImportReport:
+    report = ImportReport('courses')
+    teachers = {username for (username,) in
+                db_connection.execute('SELECT Username FROM Users WHERE Privilege = ?', ('Teacher',))}
+
+    def check(line: int, row: dict):
+        course_name, professor = row.get('course_name', ''), row.get('professor', '')
+        if not course_name or not row.get('room_number'):
+            report.error(line, 'course_name and room_number are required')
+            return None
+        if professor not in teachers:
+            report.error(line, f"professor {professor!r} is not a teacher")
+            return None
+        return course_name, professor, row['room_number']
+
+    return load(db_connection, rows, INSERT_COURSE, check, report, chunk_size)
+
+
+# Purpose: load enrollments by username and course name; unknown names and repeat enrollments are rejected
+def import_enrollments(db_connection: sqlite3.Connection, rows, chunk_size: int = CHUNK_SIZE) -> ImportReport:
+    report = ImportReport('enrollments')
+    students = dict(db_connection.execute('SELECT Username, ID FROM Users WHERE Privilege = ?', ('Student',)))
+    courses = {}
+    # course names are not unique; like Database.get_course_id_by_name, the lowest CourseID wins
+    for course_name, course_id in db_connection.execute('SELECT CourseName, CourseID FROM Courses ORDER BY CourseID DESC'):
+        courses[course_name] = course_id
+    enrolled = set(db_connection.execute('SELECT CourseID, StudentID FROM Enrollments'))
+
+    def check(line: int, row: dict):
+        student_id = students.get(row.get('username', ''))
+        if student_id is None:
+            report.error(line, f"no student named {row.get('username', '')!r}")
+            return None
+        course_id = courses.get(row.get('course_name', ''))
+        if course_id is None:
+            report.error(line, f"no course named {row.get('course_name', '')!r}")
+            return None
+        if (course_id, student_id) in enrolled:
+            report.error(line, f"{row['username']} is already enrolled in {row['course_name']}")
+            return None
+        enrolled.add((course_id, student_id))
+        return course_id, student_id
+
+    return load(db_connection, rows, INSERT_ENROLLMENT, check, report, chunk_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Bulk-load users, courses and enrollments from CSV files')
+    parser.add_argument('--db', default=DB_PATH, help='SQLite database file')
+    parser.add_argument('--users', help='CSV of users')
+    parser.add_argument('--courses', help='CSV of courses')
+    parser.add_argument('--enrollments', help='CSV of enrollments')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='rows per executemany and commit')
+    parser.add_argument('--max-errors', type=int, default=20, help='rejected rows to print per file')
+    args = parser.parse_args()
+    if not (args.users or args.courses or args.enrollments):
+        parser.error('give at least one of --users, --courses, --enrollments')
+
+    db_connection = sqlite3.connect(args.db, timeout=30)
+    db_connection.execute('PRAGMA journal_mode=WAL')
+    migrations.migrate_connection(db_connection)
+    rejected = 0
+    # users first, so the courses and enrollments in the same run can refer to them
+    for path, import_file in ((args.users, import_users), (args.courses, import_courses),
+                              (args.enrollments, import_enrollments)):
+        if not path:
+            continue
+        report = import_file(db_connection, read_csv(path), args.chunk_size)
+        print(f"{path}: {report}")
+        for line, message in report.errors[:args.max_errors]:
+            print(f"  line {line}: {message}")
+        if len(report.errors) > args.max_errors:
+            print(f"  ... {len(report.errors) - args.max_errors} more")
+        rejected += len(report.errors)
+    db_connection.close()
+    sys.exit(1 if rejected else 0)
+
+
+if __name__ == '__main__':
+    main()
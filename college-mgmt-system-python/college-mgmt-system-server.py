@@ -1,40 +1,991 @@
 # server.py
+import argparse
+import asyncio
+import bisect
+import json
+import signal
 import socket
 import threading
 import sqlite3
+import os
+import queue
+import re
+import secrets
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import protocol
 
 HOST = '127.0.0.1'
 PORT = 65432
+DB_PATH = 'collegeMGMTsystem.db'
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per connection (sqlite3's LRU cache)
+MAX_CONNECTIONS = 1000
+DB_WORKERS = 4
+DB_READERS = 4
+STREAM_IDLE_CONNECTIONS = 2  # finished streams leave up to this many connections open for the next one
+# applied to every connection; WAL lets SELECTs on the reader connections run while the writer commits
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # with WAL, only a power loss can drop the last commits; the file can't corrupt
+    'cache_size': -20000,  # negative means KiB, so about 20 MB of page cache per connection
+    'mmap_size': 268435456,
+}
+CHECKPOINT_INTERVAL = 5.0  # seconds between background WAL checkpoints, 0 leaves it to SQLite's autocheckpoint
+WAL_SIZE_LIMIT = 64 * 1024 * 1024  # past this the checkpointer truncates the WAL instead of just copying pages
+SESSION_TTL = 8 * 60 * 60  # seconds a session lives without being used
+LOGIN_QUERY = 'SELECT ID, Username, Privilege FROM Users WHERE Username = ? AND Password = ?'
+SLOW_QUERY_MS = 100.0  # statements slower than this go to the slow-query log
+# latency histogram bucket upper bounds in ms: 4 per doubling from 10 us to about 3 minutes, so a
+# percentile read off the histogram is within 19% of the true value
+LATENCY_BUCKETS = [0.01 * 2 ** (step / 4) for step in range(96)]
+RESULT_CACHE_MB = 64.0  # memory budget for cached SELECT results, 0 disables the cache
+RESULT_CACHE_TTL = 60.0  # seconds a result lives; bounds staleness from writes that bypass the server
+
+
+# identity of the session whose statement the current thread is running, read by the session_* SQL functions
+current = threading.local()
+
+
+SESSION_CALL = re.compile(r'\bsession_\w+\s*\(', re.IGNORECASE)
+NOT_LOGGED_IN = b"not logged in"
+
+
+# Purpose: value of the running statement's session for session_user_id() / session_username(); raising makes
+# the statement fail, so a query that needs a login can't quietly run without one
+def session_value(field: int):
+    user = getattr(current, 'user', None)
+    if user is None:
+        raise PermissionError("not logged in")
+    return user[field]
+
+
+# Purpose: whether a statement reads the session but has none; refused up front, since SQLite would only report
+# that a user-defined function raised
+def needs_login(query: str, user: tuple) -> bool:
+    return user is None and SESSION_CALL.search(query) is not None
+
+
+# Purpose: call function(*args) with user as the identity the session_* SQL functions see
+def run_as(user, function, *args):
+    current.user = user
+    try:
+        return function(*args)
+    finally:
+        current.user = None
+
+
+def connect_db(pragmas: dict = PRAGMAS) -> sqlite3.Connection:
+    # pooled connections are handed between threads, but only ever used by one at a time
+    db_connection = sqlite3.connect(DB_PATH, cached_statements=STATEMENT_CACHE_SIZE, check_same_thread=False)
+    for name, value in pragmas.items():
+        db_connection.execute(f'PRAGMA {name}={value}')
+    # the logged-in user comes from the server's session table, never from the client's parameters
+    db_connection.create_function('session_user_id', 0, lambda: session_value(0))
+    db_connection.create_function('session_username', 0, lambda: session_value(1))
+    return db_connection
+
+
+# Purpose: parse NAME=VALUE overrides from the command line into the pragma table
+def parse_pragmas(overrides: list) -> dict:
+    pragmas = dict(PRAGMAS)
+    for item in overrides:
+        name, _, value = item.partition('=')
+        if not name.isidentifier() or not value.lstrip('-').isalnum():
+            raise argparse.ArgumentTypeError(f"bad pragma {item!r}, expected NAME=VALUE")
+        pragmas[name] = value
+    return pragmas
+
+
+# copies the WAL back into the database file off the request path, so commits never pay for a checkpoint
+# and the WAL can't grow without bound while readers keep old snapshots open
+class Checkpointer:
+    def __init__(self, pragmas: dict, interval: float = CHECKPOINT_INTERVAL) -> None:
+        self.pragmas = pragmas
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.runs = 0
+        self.truncations = 0
+        self.wal_pages = 0
+        self.thread = threading.Thread(target=self.__loop, name='db-checkpoint', daemon=True)
+        self.thread.start()
+
+    def __loop(self) -> None:
+        db_connection = connect_db(self.pragmas)
+        while not self.stopped.wait(self.interval):
+            try:
+                _, self.wal_pages, _ = db_connection.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+                self.runs += 1
+                if os.path.exists(DB_PATH + '-wal') and os.path.getsize(DB_PATH + '-wal') > WAL_SIZE_LIMIT:
+                    db_connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                    self.truncations += 1
+            except sqlite3.Error as e:
+                print(f"Checkpoint failed: {e}")
+        db_connection.close()
+
+    def stats(self) -> list:
+        return [('checkpoints', self.runs), ('checkpoint_truncations', self.truncations),
+                ('wal_pages', self.wal_pages)]
+
+    def close(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+
+# logged-in users by session token, kept in memory so resolving who a client is never touches the Users table
+class SessionTable:
+    def __init__(self, ttl: float = SESSION_TTL) -> None:
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.sessions = {}  # token -> [user id, username, privilege, last used]
+        self.swept_at = time.monotonic()
+
+    # Purpose: start a session for an authenticated user and return its token
+    def create(self, user_id: int, username: str, privilege: str) -> str:
+        token = secrets.token_hex(16)
+        now = time.monotonic()
+        with self.lock:
+            self.sessions[token] = [user_id, username, privilege, now]
+            if now - self.swept_at > 60:
+                self.swept_at = now
+                for stale in [key for key, entry in self.sessions.items() if now - entry[3] > self.ttl]:
+                    del self.sessions[stale]
+        return token
+
+    # Purpose: (user id, username, privilege) for a live token, else None; using a session keeps it alive
+    def get(self, token: str):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.sessions.get(token)
+            if entry is None:
+                return None
+            if now - entry[3] > self.ttl:
+                del self.sessions[token]
+                return None
+            entry[3] = now
+            return entry[0], entry[1], entry[2]
+
+    def drop(self, token: str) -> None:
+        with self.lock:
+            self.sessions.pop(token, None)
+
+    def stats(self) -> list:
+        with self.lock:
+            return [('sessions', len(self.sessions))]
+
+
+# per statement template counters and latency histograms, plus a log of slow statements with their query plan;
+# the SQL text is the template, since parameters are always bound separately
+class QueryMetrics:
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, slow_log_path: str = None) -> None:
+        self.slow_ms = slow_ms
+        self.slow_log_path = slow_log_path
+        self.lock = threading.Lock()
+        self.templates = {}  # template -> [count, errors, rows, bytes, total seconds, max seconds, bucket counts]
+        self.slow = deque(maxlen=100)  # the most recent slow statements, for the dump
+        self.plans = {}  # template -> (explained at, plan), so a template that is always slow is explained once a minute
+
+    # Purpose: count one execution of a statement that returned rows and sent nbytes back to the client
+    def record(self, query: str, seconds: float, error: bool, rows: int, nbytes: int) -> None:
+        template = ' '.join(query.split())
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds * 1000)
+        with self.lock:
+            entry = self.templates.get(template)
+            if entry is None:
+                entry = self.templates[template] = [0, 0, 0, 0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+            entry[0] += 1
+            entry[1] += error
+            entry[2] += rows
+            entry[3] += nbytes
+            entry[4] += seconds
+            entry[5] = max(entry[5], seconds)
+            entry[6][bucket] += 1
+
+    def is_slow(self, seconds: float) -> bool:
+        return self.slow_ms is not None and seconds * 1000 >= self.slow_ms
+
+    # Purpose: log a slow statement with its EXPLAIN QUERY PLAN, run on db_connection with the same parameters
+    def log_slow(self, db_connection: sqlite3.Connection, query: str, params: tuple, seconds: float) -> None:
+        template = ' '.join(query.split())
+        now = time.time()
+        with self.lock:
+            cached = self.plans.get(template)
+        if cached and now - cached[0] < 60:
+            plan = cached[1]
+        else:
+            try:
+                plan = [row[3] for row in db_connection.execute('EXPLAIN QUERY PLAN ' + query, params)]
+            except sqlite3.Error as e:
+                plan = [f"no plan: {e}"]
+            with self.lock:
+                self.plans[template] = (now, plan)
+        entry = {'time': now, 'ms': seconds * 1000, 'query': template, 'plan': plan}
+        lines = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))} slow query {entry['ms']:.1f} ms: {template}\n" + \
+            ''.join(f"    {step}\n" for step in plan)
+        with self.lock:
+            self.slow.append(entry)
+            if self.slow_log_path:
+                with open(self.slow_log_path, 'a') as log_file:
+                    log_file.write(lines)
+            else:
+                print(lines, end='')
+
+    # Purpose: latency in ms at percentile p, read off a histogram as the upper bound of its bucket
+    @staticmethod
+    def percentile(buckets: list, count: int, p: float) -> float:
+        rank = count * p / 100
+        seen = 0
+        for index, bucket_count in enumerate(buckets):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return LATENCY_BUCKETS[min(index, len(LATENCY_BUCKETS) - 1)]
+        return 0.0
+
+    # Purpose: one (template, count, errors, rows, bytes, avg ms, p50, p95, p99, max ms) row per template, slowest first
+    def rows(self) -> list:
+        with self.lock:
+            entries = [(template, entry[:6], list(entry[6])) for template, entry in self.templates.items()]
+        rows = []
+        for template, (count, errors, rows_sent, bytes_sent, total, longest), buckets in entries:
+            rows.append((template, count, errors, rows_sent, bytes_sent, total / count * 1000,
+                         min(self.percentile(buckets, count, 50), longest * 1000),
+                         min(self.percentile(buckets, count, 95), longest * 1000),
+                         min(self.percentile(buckets, count, 99), longest * 1000), longest * 1000))
+        rows.sort(key=lambda row: row[1] * row[5], reverse=True)  # by total time spent
+        return rows
+
+    # Purpose: write every template's metrics and the recent slow statements to a JSON file
+    def dump(self, path: str) -> None:
+        columns = ('template', 'count', 'errors', 'rows', 'bytes', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')
+        with self.lock:
+            slow = list(self.slow)
+        with open(path, 'w') as dump_file:
+            json.dump({'templates': [dict(zip(columns, row)) for row in self.rows()], 'slow_queries': slow},
+                      dump_file, indent=2)
+
+
+# encoded ROWS replies for recent SELECTs, keyed by statement and parameters, so hot reads skip the reader pool.
+# The tables a statement reads come from SQLite's authorizer when the statement is first seen, so joins, comma
+# lists, subqueries and views are all covered; a write drops the entries of the table it names. Each table has a
+# generation that a write bumps after it commits; a read remembers the generations it started under and its
+# result is only stored if none of its tables moved, so a read racing a write can't cache the old rows
+class ResultCache:
+    # results that can change without any write: clocks, random values, per-connection state, pragmas
+    VOLATILE = re.compile(r'\b(?:random|randomblob|date|time|datetime|julianday|strftime|unixepoch|changes|'
+                          r'total_changes|last_insert_rowid)\s*\(|\bcurrent_(?:date|time|timestamp)\b|'
+                          r'\b(?:pragma|sqlite)_\w+', re.IGNORECASE)
+    ENTRY_OVERHEAD = 200  # rough bytes per entry for the key tuple, dict slot and bookkeeping
+    TEMPLATE_LIMIT = 4096  # statements whose tables are remembered; past this the list starts over
+    WRITES = (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE)
+    # anything else a write statement may compile to without touching the schema or connection state
+    PLAIN = (sqlite3.SQLITE_READ, sqlite3.SQLITE_SELECT, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE)
+
+    def __init__(self, max_bytes: int = int(RESULT_CACHE_MB * 1024 * 1024), ttl: float = RESULT_CACHE_TTL) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (expires_at, tables, payload, size)
+        self.read_tables = {}  # statement -> frozenset of the tables it reads
+        self.write_tables = {}  # statement -> frozenset of the tables it changes
+        self.tables = {}  # table -> generation
+        self.epoch = 0  # bumped when every table is invalidated at once
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    @staticmethod
+    def key(query: str, params: tuple, scope):
+        # the exact SQL text, since whitespace inside a string literal is part of the statement; parameter types
+        # are part of the key because 1, 1.0 and True compare equal but bind differently
+        try:
+            key = (query, tuple((type(value), value) for value in params), scope)
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    # Purpose: a cached ROWS payload, or None; a miss also returns the token put() needs to store the result
+    def get(self, query: str, params: tuple, user: tuple = None) -> tuple:
+        if self.max_bytes <= 0 or self.VOLATILE.search(query):
+            return None, None
+        key = self.key(query, params, user[0] if user is not None and SESSION_CALL.search(query) else None)
+        if key is None:
+            return None, None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], None
+            if entry is not None:
+                self.__remove(key)
+            self.misses += 1
+            return None, (key, self.epoch, dict(self.tables))
+
+    # Purpose: the tables a statement reads, asked of SQLite through the authorizer while it prepares an
+    # EXPLAIN of it (nothing runs); None if that fails, so the result just isn't cached. Setting an authorizer
+    # expires the connection's prepared statements, which is why this is done once per statement, not per miss
+    def tables_read(self, db_connection: sqlite3.Connection, query: str, params: tuple):
+        tables = self.read_tables.get(query)
+        if tables is not None:
+            return tables
+        seen = set()
+        prepared = []
+
+        def authorize(action, name, column, database, source):
+            if action == sqlite3.SQLITE_READ:
+                seen.add(name.lower())
+            elif action == sqlite3.SQLITE_SELECT:
+                prepared.append(True)
+            return sqlite3.SQLITE_OK
+
+        db_connection.set_authorizer(authorize)
+        try:
+            db_connection.execute('EXPLAIN ' + query, params)
+        except sqlite3.Error:
+            return None
+        finally:
+            db_connection.set_authorizer(None)
+        if not prepared:
+            return None  # the statement was never compiled, so the authorizer saw nothing
+        tables = frozenset(seen)
+        self.__remember(self.read_tables, query, tables)
+        return tables
+
+    # Purpose: the tables a write statement changes, asked of SQLite the same way on the writer connection. The
+    # authorizer sees the statement's own INSERT / UPDATE / DELETE and those of the triggers it fires; foreign key
+    # actions are coded with the authorizer off, so tables that cascade from a changed one come from the schema.
+    # None for DDL, PRAGMA, a statement that doesn't prepare or anything else that can't be pinned to its tables
+    def tables_written(self, db_connection: sqlite3.Connection, query: str, params: tuple):
+        if self.max_bytes <= 0:
+            return None
+        tables = self.write_tables.get(query)
+        if tables is not None:
+            return tables
+        seen = set()
+        other = []
+
+        def authorize(action, name, column, database, source):
+            if action in self.WRITES:
+                seen.add(name.lower())
+            elif action not in self.PLAIN:
+                other.append(action)
+            return sqlite3.SQLITE_OK
+
+        db_connection.set_authorizer(authorize)
+        try:
+            db_connection.execute('EXPLAIN ' + query, params)
+        except sqlite3.Error:
+            return None
+        finally:
+            db_connection.set_authorizer(None)
+        if other or not seen:
+            return None
+        try:
+            tables = frozenset(self.cascades(db_connection, seen))
+        except sqlite3.Error:
+            return None
+        self.__remember(self.write_tables, query, tables)
+        return tables
+
+    # Purpose: tables plus every table whose ON DELETE / ON UPDATE action reaches it through a chain of foreign keys
+    @staticmethod
+    def cascades(db_connection: sqlite3.Connection, tables: set) -> set:
+        children = {}
+        for (child,) in db_connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+            for parent, on_update, on_delete in db_connection.execute(
+                    'SELECT "table", on_update, on_delete FROM pragma_foreign_key_list(?)', (child,)):
+                if on_update not in ('NO ACTION', 'RESTRICT') or on_delete not in ('NO ACTION', 'RESTRICT'):
+                    children.setdefault(parent.lower(), set()).add(child.lower())
+        pending = list(tables)
+        tables = set(tables)
+        while pending:
+            for child in children.get(pending.pop(), ()):
+                if child not in tables:
+                    tables.add(child)
+                    pending.append(child)
+        return tables
+
+    def __remember(self, templates: dict, query: str, tables: frozenset) -> None:
+        with self.lock:
+            if len(templates) >= self.TEMPLATE_LIMIT:
+                templates.clear()
+            templates[query] = tables
+
+    def put(self, token: tuple, tables: frozenset, payload: bytes) -> None:
+        key, epoch, generations = token
+        size = len(payload) + len(key[0]) + self.ENTRY_OVERHEAD
+        if size > self.max_bytes // 16:
+            return  # one huge result shouldn't flush everything else
+        with self.lock:
+            if epoch != self.epoch or any(self.tables.get(table, 0) != generations.get(table, 0) for table in tables):
+                return  # a write to one of its tables landed while this read ran
+            if key in self.entries:
+                self.__remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, tables, payload, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self.__remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def __remove(self, key: tuple) -> None:
+        self.bytes -= self.entries.pop(key)[3]
+
+    # Purpose: forget cached results that depend on the tables committed writes changed (from tables_written);
+    # None drops everything, along with the remembered tables of each statement since the schema may have changed
+    def invalidate(self, tables) -> None:
+        if self.max_bytes <= 0:
+            return
+        with self.lock:
+            self.invalidations += 1
+            if tables is None:
+                self.epoch += 1
+                self.entries.clear()
+                self.bytes = 0
+                self.read_tables.clear()
+                self.write_tables.clear()
+                return
+            for table in tables:
+                self.tables[table] = self.tables.get(table, 0) + 1
+            for key in [key for key, entry in self.entries.items() if not tables.isdisjoint(entry[1])]:
+                self.__remove(key)
+
+    def stats(self) -> list:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return [('result_cache_entries', len(self.entries)), ('result_cache_bytes', self.bytes),
+                    ('result_cache_hits', self.hits), ('result_cache_misses', self.misses),
+                    ('result_cache_hit_rate', self.hits / lookups if lookups else 0.0),
+                    ('result_cache_evictions', self.evictions), ('result_cache_invalidations', self.invalidations)]
+
+
+def is_read(query: str) -> bool:
+    return query.lower().startswith('select')
+
 
+# Purpose: run one statement on the given connection and return the (type, payload) reply
+def execute_query(db_connection: sqlite3.Connection, query: str, params: tuple) -> tuple:
+    try:
+        cursor = db_connection.cursor()
+        # the SQL text stays identical across calls, so sqlite3 reuses the cached prepared statement
+        cursor.execute(query, params)
+        if is_read(query):
+            return protocol.ROWS, protocol.encode_rows(cursor.fetchall())
+        db_connection.commit()
+        return protocol.OK, b''
+    except Exception as e:
+        db_connection.rollback()
+        return protocol.ERROR, str(e).encode()
 
-def handle_client(conn):
-    lock = threading.Lock()
-    db_connection = sqlite3.connect('collegeMGMTsystem.db')
+
+# Purpose: run a list of statements inside one transaction with a single commit; any failure rolls back the lot.
+# Each statement is timed into metrics when given, and slow ones are appended to slow as (query, params, seconds)
+# for the caller to explain once the transaction is over
+def execute_batch(db_connection: sqlite3.Connection, statements: list, metrics: QueryMetrics = None,
+                  slow: list = None) -> tuple:
     cursor = db_connection.cursor()
-    while True:
-        data = conn.recv(1024).decode()
-        if not data:
-            break
-        query = data.strip()
-        try:
-            with lock:
-                cursor.execute(query)
-                if query.lower().startswith('select'):
-                    result = cursor.fetchall()
-                    conn.sendall(str(result).encode())
-                else:
-                    conn.sendall(b'Success')
-                db_connection.commit()
+    replies = []
+    try:
+        cursor.execute('BEGIN')
+        for index, (query, params) in enumerate(statements):
+            query = query.strip()
+            started = time.perf_counter()
+            try:
+                cursor.execute(query, params)
+                reply = (protocol.ROWS, protocol.encode_rows(cursor.fetchall())) if is_read(query) else (protocol.OK, b'')
+            except Exception as e:
+                if metrics is not None:
+                    metrics.record(query, time.perf_counter() - started, True, 0, 0)
+                db_connection.rollback()
+                return protocol.ERROR, f"statement {index}: {e}".encode()
+            if metrics is not None:
+                elapsed = time.perf_counter() - started
+                metrics.record(query, elapsed, False, protocol.row_count(reply[1]) if reply[1] else 0, len(reply[1]))
+                if slow is not None and metrics.is_slow(elapsed):
+                    slow.append((query, params, elapsed))
+            replies.append(reply)
+        db_connection.commit()
+    except Exception as e:
+        db_connection.rollback()
+        return protocol.ERROR, str(e).encode()
+    return protocol.BATCH, protocol.encode_batch_results(replies)
+
+
+# server-wide SQLite connections: N readers shared by all clients and one writer fed by a queue,
+# so writes from every client are serialized instead of racing for the database lock
+class DatabasePool:
+    def __init__(self, readers: int = DB_READERS, pragmas: dict = PRAGMAS,
+                 checkpoint_interval: float = CHECKPOINT_INTERVAL, metrics: QueryMetrics = None,
+                 results: ResultCache = None) -> None:
+        self.pragmas = dict(pragmas)
+        self.metrics = metrics if metrics is not None else QueryMetrics()
+        self.results = results if results is not None else ResultCache()
+        self.checkpointer = None
+        if checkpoint_interval > 0 and str(self.pragmas.get('journal_mode', '')).upper() == 'WAL':
+            self.pragmas['wal_autocheckpoint'] = 0  # the background thread takes over
+            self.checkpointer = Checkpointer(self.pragmas, checkpoint_interval)
+        self.readers = queue.Queue()
+        for _ in range(readers):
+            self.readers.put(connect_db(self.pragmas))
+        self.reader_count = readers
+        # streams are held open for as long as the client takes to read them, so they get connections of
+        # their own; sharing the readers let a few slow consumers starve every SELECT (and, on the async
+        # engine, park the executor threads in readers.get() while the streams needed them to finish)
+        self.stream_connections = deque()
+        self.streams_open = 0
+        self.stream_lock = threading.Lock()
+        self.sessions = SessionTable()
+        self.writes = queue.Queue()
+        self.stats_lock = threading.Lock()
+        self.wait = {'read': [0, 0.0, 0.0], 'write': [0, 0.0, 0.0]}  # count, total seconds, max seconds
+        self.writer = threading.Thread(target=self.__write_loop, name='db-writer', daemon=True)
+        self.writer.start()
+
+    def __record_wait(self, kind: str, seconds: float) -> None:
+        with self.stats_lock:
+            entry = self.wait[kind]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def __write_loop(self) -> None:
+        db_connection = connect_db(self.pragmas)
+        while True:
+            job = self.writes.get()
+            if job is None:
+                break
+            work, queued_at, future = job
+            self.__record_wait('write', time.perf_counter() - queued_at)
+            try:
+                future.set_result(work(db_connection))
+            except Exception as e:
+                future.set_exception(e)
+        db_connection.close()
+
+    # Purpose: decode a QUERY payload, run it on a reader or through the writer queue, and return the reply
+    def execute(self, payload, user: tuple = None) -> tuple:
+        try:
+            query, params = protocol.decode_query(payload)
+        except (protocol.ProtocolError, ValueError, IndexError) as e:
+            return protocol.ERROR, str(e).encode()
+        query = query.strip()
+        if needs_login(query, user):
+            return protocol.ERROR, NOT_LOGGED_IN
+        started = time.perf_counter()
+        if is_read(query):
+            cached, token = self.results.get(query, params, user)
+            if cached is not None:
+                reply = (protocol.ROWS, cached)
+            else:
+                db_connection = self.readers.get()
+                self.__record_wait('read', time.perf_counter() - started)
+                tables = None
+                try:
+                    reply = run_as(user, execute_query, db_connection, query, params)
+                    if token is not None and reply[0] == protocol.ROWS:
+                        tables = self.results.tables_read(db_connection, query, params)
+                finally:
+                    self.readers.put(db_connection)
+                if tables is not None:
+                    self.results.put(token, tables, reply[1])
+        else:
+            def work(db_connection):
+                reply = run_as(user, execute_query, db_connection, query, params)
+                if reply[0] == protocol.ERROR:
+                    return reply, frozenset()  # rolled back, nothing changed
+                return reply, self.results.tables_written(db_connection, query, params)
+
+            reply, tables = self.__write(work, started)
+            # before replying, so the client that wrote never reads its old rows back
+            self.results.invalidate(tables)
+        msg_type, payload = reply
+        self.__measure(query, params, started, msg_type == protocol.ERROR,
+                       protocol.row_count(payload) if msg_type == protocol.ROWS else 0,
+                       protocol.HEADER.size + len(payload))
+        return reply
+
+    # Purpose: record a finished statement, timed from when the request arrived so lock waits count; slow ones
+    # are explained on a reader connection, never the writer, so the log doesn't hold up writes
+    def __measure(self, query: str, params: tuple, started: float, error: bool, rows: int, nbytes: int) -> None:
+        elapsed = time.perf_counter() - started
+        self.metrics.record(query, elapsed, error, rows, nbytes)
+        if self.metrics.is_slow(elapsed):
+            self.__log_slow(query, params, elapsed)
+
+    def __log_slow(self, query: str, params: tuple, seconds: float) -> None:
+        db_connection = self.readers.get()
+        try:
+            self.metrics.log_slow(db_connection, query, params, seconds)
+        finally:
+            self.readers.put(db_connection)
+
+    # Purpose: generator of replies for a STREAM payload: ROWS chunks read with fetchmany, then DONE.
+    # Its connection is held until the generator finishes or is closed, and sending each chunk
+    # blocks while the client isn't reading, so a slow consumer slows the cursor instead of filling memory
+    def stream(self, payload, user: tuple = None):
+        try:
+            query, params, chunk_size = protocol.decode_stream(payload)
+        except (protocol.ProtocolError, ValueError, IndexError) as e:
+            yield protocol.ERROR, str(e).encode()
+            return
+        query = query.strip()
+        if not is_read(query):
+            yield protocol.ERROR, b"only SELECT statements can be streamed"
+            return
+        if needs_login(query, user):
+            yield protocol.ERROR, NOT_LOGGED_IN
+            return
+        started = time.perf_counter()
+        try:
+            db_connection = self.__open_stream()
+        except sqlite3.Error as e:
+            yield protocol.ERROR, str(e).encode()
+            return
+        error = False
+        rows_sent = bytes_sent = 0
+        try:
+            try:
+                cursor = run_as(user, db_connection.execute, query, params)
+            except Exception as e:
+                error = True
+                yield protocol.ERROR, str(e).encode()
+                return
+            while True:
+                try:
+                    rows = run_as(user, cursor.fetchmany, chunk_size)  # each chunk may run on another thread
+                except Exception as e:
+                    error = True
+                    yield protocol.ERROR, str(e).encode()
+                    return
+                if not rows:
+                    break
+                payload = protocol.encode_rows(rows)
+                rows_sent += len(rows)
+                bytes_sent += protocol.HEADER.size + len(payload)
+                yield protocol.ROWS, payload
+            yield protocol.DONE, b''
+        finally:
+            self.__close_stream(db_connection)
+            # timed to the last chunk, so a slow consumer shows up as a slow stream
+            self.__measure(query, params, started, error, rows_sent, bytes_sent)
+
+    # Purpose: a connection for one stream, never waiting: an idle one if there is one, else a new one
+    def __open_stream(self) -> sqlite3.Connection:
+        with self.stream_lock:
+            if self.stream_connections:
+                self.streams_open += 1
+                return self.stream_connections.pop()
+        db_connection = connect_db(self.pragmas)
+        with self.stream_lock:
+            self.streams_open += 1
+        return db_connection
+
+    def __close_stream(self, db_connection: sqlite3.Connection) -> None:
+        with self.stream_lock:
+            self.streams_open -= 1
+            if len(self.stream_connections) < STREAM_IDLE_CONNECTIONS:
+                self.stream_connections.append(db_connection)
+                return
+        db_connection.close()
+
+    # Purpose: check a LOGIN payload's credentials and open a session; the reply carries the token and identity
+    def login(self, payload) -> tuple:
+        try:
+            (username, password), = protocol.decode_rows(payload)
+        except (protocol.ProtocolError, ValueError, IndexError) as e:
+            return protocol.ERROR, str(e).encode()
+        started = time.perf_counter()
+        db_connection = self.readers.get()
+        self.__record_wait('read', time.perf_counter() - started)
+        try:
+            user = db_connection.execute(LOGIN_QUERY, (username, password)).fetchone()
         except Exception as e:
-            conn.sendall(str(e).encode())
-    conn.close()
-
-
-server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-server_socket.bind((HOST, PORT))
-server_socket.listen()
-print(f"Server listening on {HOST}:{PORT}")
-while True:
-    conn, addr = server_socket.accept()
-    print(f"Connected to {addr}")
-    threading.Thread(target=handle_client, args=(conn,)).start()
\ No newline at end of file
+            return protocol.ERROR, str(e).encode()
+        finally:
+            self.readers.put(db_connection)
+        self.metrics.record(LOGIN_QUERY, time.perf_counter() - started, False, int(user is not None), 0)
+        if user is None:
+            return protocol.ERROR, b"invalid username or password"
+        user_id, username, privilege = user
+        token = self.sessions.create(user_id, username, privilege)
+        return protocol.ROWS, protocol.encode_rows([(token, user_id, username, privilege)])
+
+    # Purpose: resolve a SESSION payload's token to the identity it was issued for
+    def session(self, payload) -> tuple:
+        identity = self.sessions.get(bytes(payload).decode(errors='replace'))
+        if identity is None:
+            return protocol.ERROR, b"session expired or unknown"
+        return protocol.ROWS, protocol.encode_rows([identity])
+
+    # Purpose: run a BATCH payload on the writer connection as a single transaction
+    def execute_batch(self, payload, user: tuple = None) -> tuple:
+        try:
+            statements = protocol.decode_batch(payload)
+        except (protocol.ProtocolError, ValueError, IndexError) as e:
+            return protocol.ERROR, str(e).encode()
+        if any(needs_login(query, user) for query, _ in statements):
+            return protocol.ERROR, NOT_LOGGED_IN
+        slow = []
+
+        def work(db_connection):
+            reply = run_as(user, execute_batch, db_connection, statements, self.metrics, slow)
+            if reply[0] == protocol.ERROR:
+                return reply, frozenset()
+            written = set()
+            for query, params in statements:
+                query = query.strip()
+                if not is_read(query):
+                    tables = self.results.tables_written(db_connection, query, params)
+                    if tables is None:
+                        return reply, None
+                    written |= tables
+            return reply, frozenset(written)
+
+        reply, tables = self.__write(work, time.perf_counter())
+        self.results.invalidate(tables)
+        # explained on a reader after the writer is done with the batch, like __measure does for single statements
+        for query, params, seconds in slow:
+            self.__log_slow(query, params, seconds)
+        return reply
+
+    # Purpose: hand work to the writer thread and wait for its reply
+    def __write(self, work, started: float) -> tuple:
+        future = Future()
+        self.writes.put((work, started, future))
+        return future.result()
+
+    # Purpose: pool size and lock-wait figures as (name, value) rows
+    def stats(self) -> list:
+        rows = [('readers', self.reader_count), ('readers_idle', self.readers.qsize()),
+                ('write_queue_depth', self.writes.qsize()), ('streams_open', self.streams_open)]
+        with self.stats_lock:
+            for kind, (count, total, longest) in self.wait.items():
+                rows.append((f'{kind}_count', count))
+                rows.append((f'{kind}_wait_avg_ms', total / count * 1000 if count else 0.0))
+                rows.append((f'{kind}_wait_max_ms', longest * 1000))
+        rows.extend(self.sessions.stats())
+        rows.extend(self.results.stats())
+        if self.checkpointer is not None:
+            rows.extend(self.checkpointer.stats())
+        return rows
+
+    def close(self) -> None:
+        self.writes.put(None)
+        self.writer.join()
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+        while not self.readers.empty():
+            self.readers.get().close()
+        with self.stream_lock:
+            while self.stream_connections:
+                self.stream_connections.pop().close()
+
+
+# per-socket state: the session a client bound with SESSION, which the statements it sends then run as
+class Client:
+    def __init__(self) -> None:
+        self.token = None
+
+    # Purpose: (user id, username, privilege) of the bound session while it is live, else None
+    def user(self, pool: DatabasePool):
+        return pool.sessions.get(self.token) if self.token else None
+
+
+# Purpose: answer one request from either engine; a payload that doesn't decode gets an ERROR reply, and the
+# framing is still intact, so the client's socket stays usable
+def dispatch(pool: DatabasePool, client: Client, msg_type: int, payload) -> tuple:
+    try:
+        return answer(pool, client, msg_type, payload)
+    except (protocol.ProtocolError, ValueError, IndexError) as e:
+        return protocol.ERROR, str(e).encode()
+
+
+def answer(pool: DatabasePool, client: Client, msg_type: int, payload) -> tuple:
+    if msg_type == protocol.QUERY:
+        return pool.execute(payload, client.user(pool))
+    if msg_type == protocol.BATCH:
+        return pool.execute_batch(payload, client.user(pool))
+    if msg_type == protocol.STATS:
+        return protocol.ROWS, protocol.encode_rows(pool.stats())
+    if msg_type == protocol.LOGIN:
+        return pool.login(payload)
+    if msg_type == protocol.SESSION:
+        # an empty token unbinds the socket; an unknown or expired one leaves it unbound
+        token = bytes(payload).decode(errors='replace')
+        client.token = None
+        if not token:
+            return protocol.OK, b''
+        reply = pool.session(payload)
+        if reply[0] == protocol.ROWS:
+            client.token = token
+        return reply
+    if msg_type == protocol.LOGOUT:
+        token = bytes(payload).decode(errors='replace')
+        pool.sessions.drop(token)
+        if client.token == token:
+            client.token = None
+        return protocol.OK, b''
+    if msg_type == protocol.METRICS:
+        return protocol.ROWS, protocol.encode_rows(pool.metrics.rows())
+    return protocol.ERROR, f"unexpected message type {msg_type}".encode()
+
+
+# legacy engine: one thread per client socket, all sharing the server's database pool
+def handle_client(conn, pool: DatabasePool):
+    # clients keep their socket open across queries, so serve requests until they hang up
+    client = Client()
+    try:
+        while True:
+            message = protocol.recv_message(conn)
+            if message is None:
+                break
+            if message[0] == protocol.STREAM:
+                for reply_type, reply in pool.stream(message[1], client.user(pool)):
+                    protocol.send_message(conn, reply_type, reply)
+                continue
+            reply_type, reply = dispatch(pool, client, *message)
+            protocol.send_message(conn, reply_type, reply)
+    except protocol.ProtocolError as e:
+        try:
+            protocol.send_message(conn, protocol.ERROR, str(e).encode())
+        except OSError:
+            pass
+    except OSError:
+        pass  # client went away mid-request
+    finally:
+        conn.close()
+
+
+def serve_threaded(host: str, port: int, pool: DatabasePool) -> None:
+    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_socket.bind((host, port))
+    server_socket.listen()
+    print(f"Server listening on {host}:{port}")
+    while True:
+        conn, addr = server_socket.accept()
+        print(f"Connected to {addr}")
+        threading.Thread(target=handle_client, args=(conn, pool), daemon=True).start()
+
+
+# asyncio engine: clients are coroutines, SQLite work runs on a small fixed pool of threads
+class AsyncServer:
+    def __init__(self, host: str, port: int, pool: DatabasePool, max_connections: int = MAX_CONNECTIONS,
+                 db_workers: int = DB_WORKERS) -> None:
+        self.host = host
+        self.port = port
+        self.pool = pool
+        self.max_connections = max_connections
+        self.connections = 0
+        self.executor = ThreadPoolExecutor(max_workers=db_workers, thread_name_prefix='db')
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.connections >= self.max_connections:
+            writer.write(protocol.pack_message(protocol.ERROR, b"server is at its connection limit"))
+            await self.__close(writer)
+            return
+        self.connections += 1
+        loop = asyncio.get_running_loop()
+        client = Client()
+        try:
+            while True:
+                message = await protocol.read_message(reader)
+                if message is None:
+                    break
+                if message[0] == protocol.STREAM:
+                    await self.__stream(writer, message[1], client.user(self.pool))
+                    continue
+                reply_type, reply = await loop.run_in_executor(self.executor, dispatch, self.pool, client, *message)
+                writer.write(protocol.pack_message(reply_type, reply))
+                await writer.drain()
+        except protocol.ProtocolError as e:
+            writer.write(protocol.pack_message(protocol.ERROR, str(e).encode()))
+        except OSError:
+            pass  # client went away mid-request
+        finally:
+            self.connections -= 1
+            await self.__close(writer)
+
+    # Purpose: pull each chunk on the executor and wait for the socket to drain before fetching the next
+    async def __stream(self, writer: asyncio.StreamWriter, payload, user: tuple) -> None:
+        loop = asyncio.get_running_loop()
+        replies = self.pool.stream(payload, user)
+        try:
+            while True:
+                reply = await loop.run_in_executor(self.executor, next, replies, None)
+                if reply is None:
+                    break
+                writer.write(protocol.pack_message(*reply))
+                await writer.drain()
+        finally:
+            replies.close()
+
+    async def __close(self, writer: asyncio.StreamWriter) -> None:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def serve(self) -> None:
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print(f"Server listening on {self.host}:{self.port} (async, max {self.max_connections} connections)")
+        async with server:
+            await server.serve_forever()
+
+
+# Purpose: shut down on SIGTERM the same way as on Ctrl-C, so the pool closes and metrics are dumped
+def stop(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='College management system database server')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--engine', choices=('threaded', 'async'), default='threaded',
+                        help='threaded: one thread per client (legacy); async: asyncio event loop')
+    parser.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS,
+                        help='async engine only: clients beyond this are refused')
+    parser.add_argument('--db-workers', type=int, default=DB_WORKERS,
+                        help='async engine only: threads running SQLite queries')
+    parser.add_argument('--readers', type=int, default=DB_READERS,
+                        help='SQLite connections shared by all clients for SELECTs (writes use one more)')
+    parser.add_argument('--pragma', action='append', default=[], metavar='NAME=VALUE',
+                        help='override a SQLite pragma, e.g. --pragma synchronous=FULL (repeatable)')
+    parser.add_argument('--checkpoint-interval', type=float, default=CHECKPOINT_INTERVAL,
+                        help='seconds between background WAL checkpoints, 0 to disable')
+    parser.add_argument('--slow-query-ms', type=float, default=SLOW_QUERY_MS,
+                        help='log statements slower than this with their query plan, 0 to disable')
+    parser.add_argument('--slow-query-log', metavar='PATH', help='append the slow-query log here instead of printing it')
+    parser.add_argument('--result-cache-mb', type=float, default=RESULT_CACHE_MB,
+                        help='memory for cached SELECT results, 0 to disable')
+    parser.add_argument('--result-cache-ttl', type=float, default=RESULT_CACHE_TTL,
+                        help='seconds a cached result is served; bounds staleness after bulk_import.py writes')
+    parser.add_argument('--metrics-dump', metavar='PATH', help='write per-query metrics as JSON here on shutdown')
+    args = parser.parse_args()
+    try:
+        pragmas = parse_pragmas(args.pragma)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    metrics = QueryMetrics(args.slow_query_ms or None, args.slow_query_log)
+    results = ResultCache(int(args.result_cache_mb * 1024 * 1024), args.result_cache_ttl)
+    pool = DatabasePool(args.readers, pragmas, args.checkpoint_interval, metrics, results)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        if args.engine == 'async':
+            server = AsyncServer(args.host, args.port, pool, args.max_connections, args.db_workers)
+            asyncio.run(server.serve())
+        else:
+            serve_threaded(args.host, args.port, pool)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+        if args.metrics_dump:
+            metrics.dump(args.metrics_dump)
+            print(f"Query metrics written to {args.metrics_dump}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,97 +1,350 @@
 # client.py
+# matplotlib, the grade analytics (NumPy) and the faculty scraper (requests, BeautifulSoup) are imported inside
+# the pages that use them so they don't slow down startup; benchmarks/startup.py checks that they stay out of it.
+# Run with CMS_TRACE=trace.json to record where each page's time goes (see tracing.py)
 import socket
 import tkinter as tk
 from tkinter import *
 from tkinter import ttk, messagebox
 import tkinter.font as tkFont
-import matplotlib.pyplot as plt
-import ast
-from math import floor
 from PIL import ImageTk, Image
 import sqlite3
-import requests
-from bs4 import BeautifulSoup
 from tkinter.scrolledtext import ScrolledText
-
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import (
-    FigureCanvasTkAgg,
-    NavigationToolbar2Tk
-)
-
-
+import threading
+import time
+from collections import OrderedDict, deque
+
+import migrations
+import protocol
+import tracing
+
+
+HOST = '127.0.0.1'
+PORT = 65432
+POOL_SIZE = 4
+CACHE_SIZE = 256  # SELECT results kept on the client, 0 turns the cache off
+PAGE_SIZE = 100  # rows fetched per page by the scrolling tables
+CACHE_TTL = 30.0  # seconds before a cached result is fetched again, bounds staleness from other clients' writes
+
+
+# keeps a few long-lived sockets to the server so queries don't pay for a new connection each time
+class ConnectionPool:
+    def __init__(self, host: str = HOST, port: int = PORT, size: int = POOL_SIZE, timeout: float = 10.0) -> None:
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+        self.idle = deque()
+        self.slots = threading.BoundedSemaphore(size)  # caps the number of sockets open at once
+        self.lock = threading.Lock()
+        self.token = None  # session every socket should run as, None before login
+        self.bound = {}  # socket -> token it last sent with SESSION
+
+    # open a new socket with TCP keep-alive turned on
+    def __connect(self) -> socket.socket:
+        conn = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    # borrow a socket bound to the current session, reusing an idle one when possible; returns the socket and
+    # whether it was reused
+    def acquire(self) -> tuple:
+        self.slots.acquire()
+        try:
+            while True:
+                with self.lock:
+                    conn = self.idle.pop() if self.idle else None
+                reused = conn is not None
+                if conn is None:
+                    conn = self.__connect()
+                try:
+                    self.__bind(conn)
+                except (OSError, protocol.ProtocolError):
+                    self.bound.pop(conn, None)
+                    conn.close()
+                    if reused:
+                        continue  # the server dropped an idle socket; SESSION is safe to send again
+                    raise
+                return conn, reused
+        except BaseException:
+            self.slots.release()
+            raise
+
+    # a socket of its own for one stream, outside the pool's slots: the stream can stay open for as long as its
+    # caller loops, and Database calls made inside that loop must still be able to get a pooled socket
+    def open_stream(self) -> socket.socket:
+        conn = self.__connect()
+        try:
+            self.__bind(conn)
+        except BaseException:
+            self.close_stream(conn)
+            raise
+        return conn
+
+    def close_stream(self, conn: socket.socket) -> None:
+        self.bound.pop(conn, None)
+        conn.close()
+
+    # tell the server which session a socket's statements run as, once per socket and per login; new sockets
+    # start unbound, so a reconnect picks the session up again here
+    def __bind(self, conn: socket.socket) -> None:
+        token = self.token
+        if self.bound.get(conn) == token:
+            return
+        protocol.send_message(conn, protocol.SESSION, token.encode() if token else b'')
+        if protocol.recv_message(conn) is None:
+            raise ConnectionResetError("server closed the connection")
+        self.bound[conn] = token  # an expired token stays bound; queries that need the login then fail
+
+    # hand a socket back; broken ones are closed instead of being reused
+    def release(self, conn: socket.socket, broken: bool = False) -> None:
+        if broken:
+            self.bound.pop(conn, None)
+            conn.close()
+        else:
+            with self.lock:
+                self.idle.append(conn)
+        self.slots.release()
+
+    # send one framed message and return the (type, payload) reply, reconnecting if a pooled socket has gone stale
+    def request(self, msg_type: int, payload: bytes) -> tuple:
+        while True:
+            with tracing.span('connect') as span:
+                conn, reused = self.acquire()
+                span.note(reused=reused)
+            # only safe to resend while the server can't have run the request: the send failed, or the socket
+            # was closed or reset before any of the reply arrived. A timeout may mean a slow write is still
+            # running, so it is never retried
+            stale = False
+            try:
+                with tracing.span('send', bytes=len(payload)):
+                    try:
+                        protocol.send_message(conn, msg_type, payload)
+                    except TimeoutError:
+                        raise
+                    except OSError:
+                        stale = True
+                        raise
+                with tracing.span('server') as span:  # the server running the request plus the reply's transfer
+                    try:
+                        first = conn.recv(1, socket.MSG_PEEK)
+                    except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
+                        stale = True
+                        raise
+                    if not first:
+                        stale = True
+                        raise ConnectionResetError("server closed the connection")
+                    response = protocol.recv_message(conn)
+                    span.note(bytes=len(response[1]))
+            except (OSError, protocol.ProtocolError):
+                self.release(conn, broken=True)
+                if reused and stale:
+                    continue  # the server dropped an idle socket, so the request never ran; try again
+                raise
+            self.release(conn)
+            return response
+
+    def close(self) -> None:
+        with self.lock:
+            while self.idle:
+                conn = self.idle.pop()
+                self.bound.pop(conn, None)
+                conn.close()
+
+
+# LRU of SELECT results keyed by (query, params); a write to a table drops every cached read of that table
+class QueryCache:
+    def __init__(self, size: int = CACHE_SIZE, ttl: float = CACHE_TTL) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, tables, rows)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, rows) -> None:
+        if self.size <= 0:
+            return
+        tables = protocol.read_tables(key[0])
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, tables, rows)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    # Purpose: forget cached reads that depend on the table a write statement names. Tables changed only through
+    # a trigger or foreign key action aren't visible here, like other clients' writes they show up after ttl
+    def invalidate(self, query: str) -> None:
+        table = protocol.written_table(query)
+        with self.lock:
+            if table is None:
+                self.entries.clear()  # DDL or something unrecognised, play it safe
+                return
+            for key in [key for key, entry in self.entries.items() if table in entry[1]]:
+                del self.entries[key]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+# statements issued inside `with db.batch() as batch:` are held back and sent together when the block ends;
+# the server runs them in one transaction, filling batch.results (one per statement) or batch.error
+class Batch:
+    def __init__(self, db) -> None:
+        self.db = db
+        self.statements = []
+        self.results = None
+        self.error = None
+        self.depth = 0
+
+    def __enter__(self):
+        self.depth += 1
+        self.db.current_batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.depth -= 1
+        if self.depth:
+            return False  # nested batch, the outermost one sends everything
+        self.db.current_batch = None
+        if exc_type is None and self.statements:
+            self.db.run_batch(self)
+        return False
+
+
+# the logged-in user, as issued by the server; queries about "my" data read it on the server through session_user_id()
+# and session_username(), so the client never supplies its own identity
+class Session:
+    def __init__(self, token: str, user_id: int, username: str, privilege: str) -> None:
+        self.token = token
+        self.user_id = user_id
+        self.username = username
+        self.privilege = privilege
+
+
+@tracing.traced('db')
 class Database:
-    def __init__(self):
+    def __init__(self, host: str = HOST, port: int = PORT, pool_size: int = POOL_SIZE,
+                 cache_size: int = CACHE_SIZE, cache_ttl: float = CACHE_TTL):
+        self.pool = ConnectionPool(host, port, pool_size)
+        self.cache = QueryCache(cache_size, cache_ttl)
+        self.current_batch = None
+        self.grade_analytics = None
+        self.session = None
         self.create_tables()
 
-    # init the tables
-    def format_query(self, sql_query: str, values: tuple) -> list:
-        if values:
-            formatted_query = sql_query
-            for value in values:
-                for value1 in value:
-                    formatted_query = formatted_query.replace('?', f"'{value1}'", 1)
-            return formatted_query
-        return sql_query
-
-    def send_query(self, query, *args):
-        query = self.format_query(query, args)
-        client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client_socket.connect(('127.0.0.1', 65432))
-        client_socket.sendall(query.encode())
-        response = client_socket.recv(1024).decode()
-        if response == '[]':
-            return None
-        if response[0] == "[":
-            return ast.literal_eval(response)  # converts a string format return into a list of appropriate data
-        return response
+    # turn a server reply into send_query's return value
+    def __decode_reply(self, msg_type: int, payload):
+        if msg_type == protocol.ROWS:
+            rows = protocol.decode_rows(payload)  # list of row tuples
+            return rows if rows else None
+        if msg_type == protocol.OK:
+            return 'Success'
+        return bytes(payload).decode()  # error message from the server
+
+    # send a SQL template and its parameters; the server binds the values so quotes and '?' in data are safe
+    def send_query(self, query, params=()):
+        if self.current_batch is not None:
+            self.current_batch.statements.append((query, params))
+            return None  # results arrive on the batch when it is sent
+        is_select = query.lstrip()[:6].lower() == 'select'
+        if is_select:
+            key = (query, tuple(params))
+            with tracing.span('cache', query=query) as span:
+                cached = self.cache.get(key)
+                span.note(hit=cached is not None)
+            if cached is not None:
+                return cached[2]
+        msg_type, payload = self.pool.request(protocol.QUERY, protocol.encode_query(query, params))
+        with tracing.span('decode', bytes=len(payload)):
+            result = self.__decode_reply(msg_type, payload)
+        if is_select:
+            if msg_type == protocol.ROWS:
+                self.cache.put(key, result)
+        else:
+            self.cache.invalidate(query)
+        return result
 
+    # yield the rows of a SELECT one at a time while the server streams them in chunks, so large results
+    # never have to fit in memory; it runs on a socket of its own, so the loop body can make other queries
+    def iter_query(self, query, params=(), chunk_size: int = 500):
+        conn = self.pool.open_stream()
+        try:
+            protocol.send_message(conn, protocol.STREAM, protocol.encode_stream(query, params, chunk_size))
+            while True:
+                response = protocol.recv_message(conn)
+                if response is None:
+                    raise ConnectionResetError("server closed the connection")
+                msg_type, payload = response
+                if msg_type == protocol.DONE:
+                    return
+                if msg_type == protocol.ERROR:
+                    raise RuntimeError(payload.decode())
+                yield from protocol.decode_rows(payload)
+        finally:
+            self.pool.close_stream(conn)
+
+    # group the following Database calls into one round trip and one commit
+    def batch(self) -> Batch:
+        return self.current_batch if self.current_batch is not None else Batch(self)
+
+    # send a batch's statements; on any failure the server rolls back all of them
+    def run_batch(self, batch: Batch) -> None:
+        msg_type, payload = self.pool.request(protocol.BATCH, protocol.encode_batch(batch.statements))
+        for query, _ in batch.statements:
+            if query.lstrip()[:6].lower() != 'select':
+                self.cache.invalidate(query)
+        if msg_type == protocol.BATCH:
+            batch.results = [self.__decode_reply(*reply) for reply in protocol.decode_batch_results(payload)]
+        else:
+            batch.error = payload.decode()
+
+    # server pool and lock-wait metrics as a {name: value} dict
+    def server_stats(self) -> dict:
+        msg_type, payload = self.pool.request(protocol.STATS, b'')
+        if msg_type != protocol.ROWS:
+            raise RuntimeError(payload.decode())
+        return dict(protocol.decode_rows(payload))
+
+    # admin: per-query-template metrics from the server as a list of dicts, the most total time first
+    def server_metrics(self) -> list:
+        msg_type, payload = self.pool.request(protocol.METRICS, b'')
+        if msg_type != protocol.ROWS:
+            raise RuntimeError(payload.decode())
+        columns = ('template', 'count', 'errors', 'rows', 'bytes', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')
+        return [dict(zip(columns, row)) for row in protocol.decode_rows(payload)]
+
+    # per-course grade statistics; the analytics module (and NumPy) load the first time they are asked for
+    def analytics(self):
+        if self.grade_analytics is None:
+            import analytics
+            self.grade_analytics = analytics.GradeAnalytics(self, self.cache.ttl)
+        return self.grade_analytics
+
+    # init the tables: apply any schema migrations this database hasn't seen yet, in one transaction
     def create_tables(self) -> None:
-        self.send_query('''CREATE TABLE IF NOT EXISTS Users (
-                                    ID INTEGER PRIMARY KEY,
-                                    Username TEXT UNIQUE,
-                                    Password TEXT,
-                                    Privilege TEXT,
-                                    DOB TEXT,
-                                    Email TEXT,
-                                    Phone TEXT,
-                                    FName TEXT,
-                                    LName TEXT
-                                )''')
-
-        self.send_query('''CREATE TABLE IF NOT EXISTS Courses (
-                                    CourseID INTEGER PRIMARY KEY,
-                                    CourseName TEXT,
-                                    LOStudents INTEGER,
-                                    Professor TEXT,
-                                    RoomNumber TEXT
-                                )''')
-
-        self.send_query('''CREATE TABLE IF NOT EXISTS Assignments (
-                                    AssignmentID INTEGER PRIMARY KEY,
-                                    Name TEXT,
-                                    Description TEXT,
-                                    CourseID INTEGER,
-                                    FOREIGN KEY (CourseID) REFERENCES Courses(CourseID)
-                                )''')
-
-        self.send_query('''CREATE TABLE IF NOT EXISTS Submissions (
-                                    ID INTEGER PRIMARY KEY,
-                                    AssignmentID INTEGER,
-                                    SubmitterID INTEGER,
-                                    Body TEXT,
-                                    Grade INTEGER,
-                                    FOREIGN KEY (AssignmentID) REFERENCES Assignments(AssignmentID),
-                                    FOREIGN KEY (SubmitterID) REFERENCES Users(ID)
-                                )''')
-
-        self.send_query('''CREATE TABLE IF NOT EXISTS Enrollments (
-                                    EnrollmentID INTEGER PRIMARY KEY,
-                                    CourseID INTEGER,
-                                    StudentID INTEGER,
-                                    FOREIGN KEY (CourseID) REFERENCES Courses(CourseID),
-                                    FOREIGN KEY (StudentID) REFERENCES Users(ID)
-                                )''')
+        rows = self.send_query(migrations.VERSION_QUERY)
+        version = rows[0][0] if isinstance(rows, list) else 0
+        statements = migrations.upgrade_statements(version)
+        if not statements:
+            return
+        with self.batch() as batch:
+            for statement in statements:
+                self.send_query(statement)
+        if batch.error:
+            raise RuntimeError(f"schema migration failed: {batch.error}")
 
     # add a user to the database
     def add_user(self, username: str, password: str, privilege: str, dob: str, email: str, phone: str, fname: str,
@@ -100,33 +353,50 @@ class Database:
                                VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
                         (username, password, privilege, dob, email, phone, fname, lname))
 
-    # Add a course to the database
-    def add_course(self, course_name: str, professor: str, room_number: str) -> None:
-        self.send_query('''INSERT INTO Courses (CourseName, Professor, RoomNumber) VALUES (?, ?, ?)''',
-                        (course_name, professor, room_number))
+    # Add a course taught by the logged-in professor to the database
+    def add_course(self, course_name: str, room_number: str) -> None:
+        self.send_query('''INSERT INTO Courses (CourseName, Professor, RoomNumber) VALUES (?, session_username(), ?)''',
+                        (course_name, room_number))
 
-    # return all courses for the given professor
-    def get_courses_by_professor(self, professor: str) -> list:
-        return self.send_query('''SELECT * FROM Courses WHERE Professor = ?''', (professor,))
+    # return all courses of the logged-in professor
+    def get_courses_by_professor(self) -> list:
+        return self.send_query('''SELECT * FROM Courses WHERE Professor = session_username()''')
 
     # add the given assignment into the assignments table
     def add_assignment(self, name: str, description: str, course_id: str) -> None:
         self.send_query('''INSERT INTO Assignments (Name, Description, CourseID) VALUES (?, ?, ?)''',
                         (name, description, course_id))
+        if self.grade_analytics is not None:
+            self.grade_analytics.invalidate(course_id)
 
     # return all assignments for the course
     def get_assignments_by_course(self, course_id: str) -> list:
         return self.send_query('''SELECT * FROM Assignments WHERE CourseID = ?''', (course_id,))
 
-    # add the given submission to the database
-    def add_submission(self, assignment_id: str, submitter_id: str, body: str) -> None:
-        self.send_query('''INSERT INTO Submissions (AssignmentID, SubmitterID, Body) VALUES (?, ?, ?)''',
-                        (assignment_id, submitter_id, body))
+    # add the logged-in student's submission to the database
+    def add_submission(self, assignment_id: str, body: str) -> None:
+        self.send_query('''INSERT INTO Submissions (AssignmentID, SubmitterID, Body) VALUES (?, session_username(), ?)''',
+                        (assignment_id, body))
+        if self.grade_analytics is not None:
+            self.grade_analytics.assignment_changed(assignment_id)
 
     # return all submissions for the given assignment
     def get_submissions_by_assignment(self, assignment_id: str) -> list:
         return self.send_query('''SELECT * FROM Submissions WHERE AssignmentID = ?''', (assignment_id,))
 
+    # one page of a course's submissions in ID order, for keyset pagination: pass the last ID already shown
+    def get_course_submissions_page(self, course_id: str, after_id: int = 0, limit: int = PAGE_SIZE) -> list:
+        return self.send_query('''SELECT s.ID, a.Name, s.SubmitterID, s.Body, s.Grade FROM Submissions s
+                                  JOIN Assignments a ON a.AssignmentID = s.AssignmentID
+                                  WHERE a.CourseID = ? AND s.ID > ?
+                                  ORDER BY s.ID LIMIT ?''', (course_id, after_id, limit))
+
+    # one page of the logged-in student's submissions in ID order, for keyset pagination
+    def get_student_submissions_page(self, after_id: int = 0, limit: int = PAGE_SIZE) -> list:
+        return self.send_query('''SELECT ID, AssignmentID, Body, Grade FROM Submissions
+                                  WHERE SubmitterID = session_username() AND ID > ?
+                                  ORDER BY ID LIMIT ?''', (after_id, limit))
+
     # return all submissions for the given student
     def get_student_submissions(self, student_username: str) -> list:
         return self.send_query('''SELECT * from SUBMISSIONS where SubmitterID = ?''', (student_username,))
@@ -135,17 +405,18 @@ class Database:
     def add_enrollment(self, course_id: str, student_id: str) -> None:
         self.send_query('''INSERT INTO Enrollments (CourseID, StudentID) VALUES (?, ?)''',
                         (course_id, student_id))
+        if self.grade_analytics is not None:
+            self.grade_analytics.invalidate(course_id)
 
-    # return all courses the given student is enrolled in
-    def get_enrolled_courses_by_student(self, student: str) -> None:
+    # return all courses the logged-in student is enrolled in, by the user ID in the server's session
+    def get_enrolled_courses_by_student(self) -> None:
         return self.send_query('''SELECT c.CourseID, c.CourseName FROM Courses c
                                JOIN Enrollments e ON c.CourseID = e.CourseID
-                               JOIN Users u ON e.StudentID = u.ID
-                               WHERE u.Username = ?''', (student,))
+                               WHERE e.StudentID = session_user_id()''')
 
     # Fetch all students from the database
     def get_students(self) -> None:
-        return self.send_query('''SELECT * FROM Users WHERE Privilege = "Student"''')
+        return self.send_query('''SELECT * FROM Users WHERE Privilege = ?''', ("Student",))
 
     # Get the ID of a course by its name
     def get_course_id_by_name(self, course_name: str) -> str:
@@ -160,6 +431,8 @@ class Database:
     def grade_submission(self, submission_id: str, grade: int) -> None:
         # Update the grade of a submission
         self.send_query('''UPDATE Submissions SET Grade = ? WHERE ID = ?''', (grade, submission_id))
+        if self.grade_analytics is not None:
+            self.grade_analytics.submission_changed(submission_id)
 
     # Get the ID of a user by their username
     def get_user_id_by_username(self, username: str) -> None:
@@ -170,17 +443,23 @@ class Database:
         else:
             return None
 
-    # returns the username only if the username and password match
+    # log in: returns a Session bound to the user's ID and privilege if the username and password match, else None
     def authenticate_user(self, username: str, password: str):
-
-        user = self.send_query(
-            """SELECT * FROM Users WHERE Username = ? AND Password = ?""",
-            (username, password),
-        )
-        if user:
-            return user
-        else:
+        msg_type, payload = self.pool.request(protocol.LOGIN, protocol.encode_rows([(username, password)]))
+        if msg_type != protocol.ROWS:
             return None
+        self.session = Session(*protocol.decode_rows(payload)[0])
+        self.pool.token = self.session.token  # every pooled socket binds to it before its next request
+        self.cache.clear()  # cached reads of session_* queries belong to whoever was logged in before
+        return self.session
+
+    # end the current session on the server
+    def logout(self) -> None:
+        if self.session is not None:
+            self.pool.request(protocol.LOGOUT, self.session.token.encode())
+            self.session = None
+            self.pool.token = None
+            self.cache.clear()
 
     def username_exists(self, username: str):
         user = self.send_query(
@@ -202,15 +481,137 @@ class Database:
             return None
 
     def close_connection(self):
-        self.conn.close()
+        self.pool.close()
 
-    def get_student_grades(self, student_username):
+    def get_student_grades(self):
         return self.send_query(
-            '''SELECT Name, Grade FROM Submissions JOIN Assignments ON Submissions.AssignmentID = Assignments.AssignmentID WHERE SubmitterID = ?''',
-            (student_username,))
-
-
-
+            '''SELECT Name, Grade FROM Submissions JOIN Assignments ON Submissions.AssignmentID = Assignments.AssignmentID WHERE SubmitterID = session_username()''')
+
+    # The aggregate queries below are computed by SQLite on the server, so only one row per group crosses
+    # the wire. Submitted counts every submission, graded only those with a grade; AVG/MIN/MAX skip ungraded ones.
+
+    # per assignment of the course: (assignment_id, name, submitted, graded, average, min, max)
+    def get_assignment_grade_stats(self, course_id: str) -> list:
+        return self.send_query('''SELECT a.AssignmentID, a.Name, COUNT(s.ID), COUNT(s.Grade),
+                                         AVG(s.Grade), MIN(s.Grade), MAX(s.Grade)
+                                  FROM Assignments a
+                                  LEFT JOIN Submissions s ON s.AssignmentID = a.AssignmentID
+                                  WHERE a.CourseID = ?
+                                  GROUP BY a.AssignmentID
+                                  ORDER BY a.AssignmentID''', (course_id,))
+
+    # per student who submitted in the course: (student, submitted, graded, average, min, max)
+    def get_student_grade_stats(self, course_id: str) -> list:
+        return self.send_query('''SELECT s.SubmitterID, COUNT(s.ID), COUNT(s.Grade),
+                                         AVG(s.Grade), MIN(s.Grade), MAX(s.Grade)
+                                  FROM Submissions s
+                                  JOIN Assignments a ON a.AssignmentID = s.AssignmentID
+                                  WHERE a.CourseID = ?
+                                  GROUP BY s.SubmitterID
+                                  ORDER BY s.SubmitterID''', (course_id,))
+
+    # per course the student has submitted to: (course_id, course_name, submitted, graded, average, min, max)
+    def get_student_course_grade_stats(self, student_username: str) -> list:
+        return self.send_query('''SELECT c.CourseID, c.CourseName, COUNT(s.ID), COUNT(s.Grade),
+                                         AVG(s.Grade), MIN(s.Grade), MAX(s.Grade)
+                                  FROM Submissions s
+                                  JOIN Assignments a ON a.AssignmentID = s.AssignmentID
+                                  JOIN Courses c ON c.CourseID = a.CourseID
+                                  WHERE s.SubmitterID = ?
+                                  GROUP BY c.CourseID
+                                  ORDER BY c.CourseID''', (student_username,))
+
+    # one row for the whole course: (assignments, enrolled students, submitted, graded, average, min, max)
+    def get_course_grade_stats(self, course_id: str):
+        rows = self.send_query('''SELECT (SELECT COUNT(*) FROM Assignments WHERE CourseID = ?),
+                                         (SELECT COUNT(*) FROM Enrollments WHERE CourseID = ?),
+                                         COUNT(s.ID), COUNT(s.Grade), AVG(s.Grade), MIN(s.Grade), MAX(s.Grade)
+                                  FROM Submissions s
+                                  JOIN Assignments a ON a.AssignmentID = s.AssignmentID
+                                  WHERE a.CourseID = ?''', (course_id, course_id, course_id))
+        return rows[0] if isinstance(rows, list) else None
+
+
+# scrolling table that only holds one Treeview item per loaded row and pulls the next page from the
+# server when the user scrolls near the bottom; fetch_page(after_id, limit) returns rows of (id, *values)
+@tracing.traced('gui')
+class PagedTable(tk.Frame):
+    def __init__(self, parent, columns: list, fetch_page, page_size: int = PAGE_SIZE, height: int = 10) -> None:
+        tk.Frame.__init__(self, parent)
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.last_id = 0
+        self.exhausted = False
+        self.loading = False  # a page fetch is already queued, so further scroll events don't queue more
+        names = [name for name, _ in columns]
+        self.tree = ttk.Treeview(self, columns=names, show='headings', height=height, selectmode='browse')
+        for name, width in columns:
+            self.tree.heading(name, text=name)
+            self.tree.column(name, width=width, stretch=False)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.__on_scroll)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+
+    # Purpose: keep the scrollbar in step and fetch more rows once the view nears the end of what is loaded
+    def __on_scroll(self, first, last) -> None:
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and not self.exhausted and not self.loading:
+            self.loading = True
+            self.after_idle(self.__load_queued)
+
+    def __load_queued(self) -> None:
+        try:
+            self.load_more()
+        finally:
+            self.loading = False
+
+    # Purpose: fetch and append the next page; returns how many rows arrived
+    def load_more(self) -> int:
+        if self.exhausted:
+            return 0
+        rows = self.fetch_page(self.last_id, self.page_size) or []
+        if isinstance(rows, str):
+            rows = []  # server error, stop paging rather than retrying on every scroll
+        for row in rows:
+            self.tree.insert('', 'end', iid=str(row[0]), values=[self.format_value(value) for value in row[1:]])
+        if rows:
+            self.last_id = rows[-1][0]
+        self.exhausted = len(rows) < self.page_size
+        return len(rows)
+
+    def format_value(self, value) -> str:
+        if value is None:
+            return ''
+        return ' '.join(str(value).split())  # Treeview cells are one line
+
+    # Purpose: change one column of a loaded row
+    def set_cell(self, row_id, column: str, value) -> None:
+        self.tree.set(str(row_id), column, self.format_value(value))
+
+    def selected_id(self):
+        selection = self.tree.selection()
+        return int(selection[0]) if selection else None
+
+    # Purpose: drop every loaded row so the next load_more starts again from the first page
+    def reset(self) -> None:
+        self.tree.delete(*self.tree.get_children())
+        self.last_id = 0
+        self.exhausted = False
+
+
+IMAGES = {}
+
+
+# decode each image file once per process; every page showing it shares the same PhotoImage
+def load_image(path: str) -> ImageTk.PhotoImage:
+    image = IMAGES.get(path)
+    if image is None:
+        image = IMAGES[path] = ImageTk.PhotoImage(Image.open(path))
+    return image
+
+
+@tracing.traced('gui')
 class SystemGUIManager(tk.Tk):
     def __init__(self, db: Database):
         tk.Tk.__init__(self)
@@ -235,12 +636,22 @@ class SystemGUIManager(tk.Tk):
         frame.show()
         frame.grid(row=0,column=0)
 
+    # Purpose: show page F, re-populating its existing frame through refresh() instead of building a new one
+    def open_page(self, F, *args):
+        frame = self.frames.get(F)
+        if frame is None:
+            self.frames[F] = F(self.frame, self, self.db, *args)
+        else:
+            frame.refresh(*args)
+        self.show_frame(F)
+
+    # Purpose: blank a page's inputs so it is fresh the next time it is shown
     def reset_frame(self,F):
-        frame = F(self.frame,self,self.db)
-        self.frames[F] = frame
+        self.frames[F].refresh()
 
 
 # create the login page
+@tracing.traced('gui')
 class LoginPage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame,controller: Tk, db: Database) -> None:
@@ -252,8 +663,8 @@ class LoginPage(tk.Frame):
 
 
         # Setting up GUI
-        self.img = ImageTk.PhotoImage(Image.open("shu_building.png"))
-        self.img2 = ImageTk.PhotoImage(Image.open('sign-in_logo.png'))
+        self.img = load_image("shu_building.png")
+        self.img2 = load_image('sign-in_logo.png')
         font = tkFont.Font(family='Arial',size=9,weight='bold')
         self.label = Label(self, image=self.img)
         self.label2 = Label(self, image=self.img2)
@@ -283,22 +694,24 @@ class LoginPage(tk.Frame):
         self.register_button.grid(row=4,column = 1, columnspan=2, sticky='n')#pady=(10,40))
         self.viewstaff.grid(row=5, column=1,columnspan=2,sticky='n')
 
+    # Purpose: To clear the typed credentials
+    def refresh(self) -> None:
+        self.username_entry.delete(0, tk.END)
+        self.password_entry.delete(0, tk.END)
 
     # Purpose: Determine whether to open the student or teacher page
     def __login(self) -> None:
         username = self.username_entry.get()
         password = self.password_entry.get()
 
-        user = self.db.authenticate_user(username, password) # Checks if user and pass entries match a user in database
-        if user:
+        session = self.db.authenticate_user(username, password) # Checks if user and pass entries match a user in database
+        if session:
             # Checks if user is a student or teacher
-            if user[0][3] == "Student":
-                self.controller.frames[StudentPage] = StudentPage(self.parent,self.controller,self.db,username)
-                self.controller.show_frame(StudentPage)
+            if session.privilege == "Student":
+                self.controller.open_page(StudentPage, session.username)
                 self.controller.reset_frame(LoginPage)
             else:
-                self.controller.frames[TeacherPage] = TeacherPage(self.parent,self.controller,self.db,username)
-                self.controller.show_frame(TeacherPage)
+                self.controller.open_page(TeacherPage, session.username)
                 self.controller.reset_frame(LoginPage)
         else:
             tk.messagebox.showerror("Error", "Invalid username or password") # Error case
@@ -310,6 +723,7 @@ class LoginPage(tk.Frame):
 
 
 # Registration page
+@tracing.traced('gui')
 class RegisterPage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame,controller: Tk,db: Database) -> None:
@@ -320,7 +734,7 @@ class RegisterPage(tk.Frame):
         ################################################
 
         # Setting up GUI
-        self.img = ImageTk.PhotoImage(Image.open('sign-in_logo.png'))
+        self.img = load_image('sign-in_logo.png')
         font = tkFont.Font(family='Arial',size=9,weight='bold')
         self.space = tk.Frame(self,width=220,bg='gray94',height=370)
         self.space2 = tk.Frame(self,width=220,bg='gray94',height=370)
@@ -379,6 +793,13 @@ class RegisterPage(tk.Frame):
         self.register_button.grid(row=10, column=2,sticky='w')
         self.back_button.grid(row=11,column=2,sticky='w')
 
+    # Purpose: To clear the form
+    def refresh(self) -> None:
+        for entry in (self.username_entry, self.password_entry, self.dob_entry, self.email_entry, self.phone_entry,
+                      self.fname_entry, self.lname_entry):
+            entry.delete(0, tk.END)
+        self.privilege_var.set("Student")
+
     # Purpose: To return to the previous page
     def __back(self) -> None:
         self.controller.show_frame(LoginPage)
@@ -409,6 +830,7 @@ class RegisterPage(tk.Frame):
 
 
 # teacher's landing page
+@tracing.traced('gui')
 class TeacherPage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame,controller: Tk,db: Database,professor: str) -> None:
@@ -435,8 +857,12 @@ class TeacherPage(tk.Frame):
                                                bg='RoyalBlue',fg='white',font=font2)
         self.view_submissions_button = tk.Button(self, text="View Submissions", command=self.__view_submissions,width=24,
                                                  bg='RoyalBlue',fg='white',font=font2)
+        self.grade_report_button = tk.Button(self, text="Grade Report", command=self.__view_grade_report,width=24,
+                                             bg='RoyalBlue',fg='white',font=font2)
         self.add_student_label = tk.Label(self, text="Add Student:",bg='white',font=font2)
         self.selected_student = tk.StringVar()
+        self.courses = []
+        self.students = []
         self.student_combo = ttk.Combobox(self, textvariable=self.selected_student, width=15)
         self.add_student_button = tk.Button(self, text="Add Student to Class", command=self.__add_student_to_class,width=24,
                                             bg='RoyalBlue',fg='white',font=font2)
@@ -444,35 +870,51 @@ class TeacherPage(tk.Frame):
 
     # Purpose: To show widgets on window
     def show(self):
-        self.space.grid(row=0,column=0,rowspan=10)
-        self.space2.grid(row=0,column=3,rowspan=10)
+        self.space.grid(row=0,column=0,rowspan=11)
+        self.space2.grid(row=0,column=3,rowspan=11)
         self.space3.grid(row=0,column=1,columnspan=2,sticky='n')
-        self.space4.grid(row=9,column=1,columnspan=2)
+        self.space4.grid(row=10,column=1,columnspan=2)
         self.label.grid(row=1, column=1, columnspan=2)
         self.create_course_button.grid(row=2, column=1, columnspan=2)
         self.course_label.grid(row=3, column=1, sticky='e')
         self.course_combo.grid(row=3, column=2, sticky="w")
         self.add_assignment_button.grid(row=4, column=1, columnspan=2)
         self.view_submissions_button.grid(row=5, column=1, columnspan=2)
-        self.add_student_label.grid(row=6, column=1, sticky="e")
-        self.student_combo.grid(row=6, column=2, sticky="w")
-        self.add_student_button.grid(row=7, column=1, columnspan=2)
-        self.logout_button.grid(row=8,column=1,columnspan=2)
+        self.grade_report_button.grid(row=6, column=1, columnspan=2)
+        self.add_student_label.grid(row=7, column=1, sticky="e")
+        self.student_combo.grid(row=7, column=2, sticky="w")
+        self.add_student_button.grid(row=8, column=1, columnspan=2)
+        self.logout_button.grid(row=9,column=1,columnspan=2)
 
         self.__populate_courses()
         self.__populate_students()
 
+    # Purpose: To reuse the page for the professor who just logged in
+    def refresh(self, professor: str) -> None:
+        self.professor = professor
+        self.label.config(text=f"Welcome, {self.professor}!")
+        self.courses = []
+        self.course_combo['values'] = []  # the last teacher's courses must not stay selectable
+        self.selected_course.set('')
+        self.selected_student.set('')
+
     # Purpose: To list all the courses
     def __populate_courses(self) -> None:
-        courses = self.db.get_courses_by_professor(self.professor)
-        if courses is not None:
-            course_names = [course[1] for course in courses]
-            self.course_combo['values'] = course_names
+        courses = self.db.get_courses_by_professor()
+        self.courses = courses if isinstance(courses, list) else []  # None when there are none, str on an error
+        self.course_combo['values'] = [course[1] for course in self.courses]
+
+    # Purpose: ID of the course picked in the box, or None (after an error message) if none of the listed ones is
+    def __selected_course_id(self):
+        index = self.course_combo.current()
+        if index < 0 or index >= len(self.courses):
+            tk.messagebox.showerror("Error", "Please select one of your classes.")
+            return None
+        return self.courses[index][0]
 
     # Purpose: To create a new course
     def __create_course(self) -> None:
-        self.controller.frames[CreateCoursePage] = CreateCoursePage(self.parent,self.controller,self.db,self.professor)
-        self.controller.show_frame(CreateCoursePage)
+        self.controller.open_page(CreateCoursePage, self.professor)
 
     # Purpose: To add a new assignment
     def __add_assignment(self) -> None:
@@ -481,10 +923,10 @@ class TeacherPage(tk.Frame):
             tk.messagebox.showerror("Error", "Please select a class.")
             return
 
-        course_id = self.db.get_courses_by_professor(self.professor)[self.course_combo.current()][0]
-        self.controller.frames[AddAssignmentPage] = AddAssignmentPage(self.parent,self.controller,self.db,self.professor,
-                                                                      course_id)
-        self.controller.show_frame(AddAssignmentPage)
+        course_id = self.__selected_course_id()
+        if course_id is None:
+            return
+        self.controller.open_page(AddAssignmentPage, self.professor, course_id)
 
     # Purpose: To view the submissions
     def __view_submissions(self) -> None:
@@ -493,22 +935,78 @@ class TeacherPage(tk.Frame):
             tk.messagebox.showerror("Error", "Please select a class.")
             return
 
-        course_id = self.db.get_courses_by_professor(self.professor)[self.course_combo.current()][0]
+        course_id = self.__selected_course_id()
+        if course_id is None:
+            return
         assignments = self.db.get_assignments_by_course(course_id)
         if assignments is not None:
-            self.controller.frames[ViewSubmissionsPage] = ViewSubmissionsPage(self.parent,self.controller,self.db,self.professor,
-                                                                          course_id)
-            self.controller.show_frame(ViewSubmissionsPage)
+            self.controller.open_page(ViewSubmissionsPage, self.professor, course_id)
         else:
             tk.messagebox.showerror("Error", "Selected Class has no current assignments.")
             self.selected_course.set('')
 
+    # Purpose: To chart the grade distribution of the selected class, per assignment and overall
+    def __view_grade_report(self) -> None:
+        course_name = self.selected_course.get()
+        if not course_name:
+            tk.messagebox.showerror("Error", "Please select a class.")
+            return
+
+        course_id = self.__selected_course_id()
+        if course_id is None:
+            return
+        report = self.db.analytics().course(course_id)
+        if not report['names']:
+            tk.messagebox.showerror("Error", "Selected Class has no current assignments.")
+            return
+
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import (
+            FigureCanvasTkAgg,
+            NavigationToolbar2Tk
+        )
+        import analytics
+
+        plot_window = tk.Toplevel(self)
+        plot_window.title(f"Grade Report: {course_name}")
+        figure = Figure(figsize=(9,5))
+        figure_canvas = FigureCanvasTkAgg(figure,plot_window)
+        NavigationToolbar2Tk(figure_canvas, plot_window)
+
+        # median with the 25th-75th percentile range per assignment, mean as a marker
+        axes = figure.add_subplot(1, 2, 1)
+        positions = range(len(report['names']))
+        p25, median, p75 = (report['percentiles'][:, analytics.PERCENTILES.index(p)] for p in (25, 50, 75))
+        axes.bar(positions, p75 - p25, bottom=p25, color='RoyalBlue', alpha=0.4, label='25th-75th percentile')
+        axes.scatter(positions, median, color='RoyalBlue', marker='_', s=300, label='median')
+        axes.scatter(positions, report['mean'], color='red', marker='o', label='mean')
+        axes.set_xticks(list(positions))
+        axes.set_xticklabels([f"{name}\n{missing} missing" for name, missing in zip(report['names'], report['missing'])],
+                             rotation=45, ha='right')
+        axes.set_ylim(0, 100)
+        axes.set_ylabel('Grade')
+        axes.set_title('Per assignment')
+        axes.legend(loc='lower left', fontsize='small')
+
+        # histogram of every graded submission in the class
+        course = report['course']
+        axes = figure.add_subplot(1, 2, 2)
+        axes.bar(analytics.BINS[:-1], course['histogram'], width=analytics.BINS[1] - analytics.BINS[0], align='edge',
+                 color='RoyalBlue', edgecolor='white')
+        axes.set_xlim(0, 100)
+        axes.set_xlabel('Grade')
+        axes.set_ylabel('Submissions')
+        axes.set_title(f"Class: mean {course['mean']:.1f}, {course['graded']} graded, {course['missing']} missing")
+        figure.tight_layout()
+
+        figure_canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
     # Purpose: To list all students in the class
     def __populate_students(self) -> None:
         # Fetch all students from the database using db object
         students = self.db.get_students()
         if students is not None:
-
+            self.students = students  # kept so adding a student needs no username -> ID lookup
             student_usernames = [student[1] for student in students]
             self.student_combo['values'] = student_usernames
 
@@ -521,21 +1019,31 @@ class TeacherPage(tk.Frame):
             tk.messagebox.showerror("Error", "Please select a class and a student.")
             return
 
-        # Get course ID
-        course_id = self.db.get_course_id_by_name(course_name)[0]
+        course_id = self.__selected_course_id()
+        if course_id is None:
+            return
 
-        # Get student ID
-        student_id = self.db.get_user_id_by_username(student_username)[0]
+        # IDs come from the listed rows; only a username typed into the box has to be looked up
+        index = self.student_combo.current()
+        if index >= 0:
+            student_id = self.students[index][0]
+        else:
+            user = self.db.get_user_id_by_username(student_username)
+            if user is None:
+                tk.messagebox.showerror("Error", f"No student named {student_username}.")
+                return
+            student_id = user[0]
         # Add enrollment
         self.db.add_enrollment(course_id, student_id)
         tk.messagebox.showinfo("Success", f"{student_username} added to class {course_name}.")
 
     # Purpose: To return to the login page
     def __logout(self) -> None:
+        self.db.logout()
         self.controller.show_frame(LoginPage)
-        self.controller.frames.pop(TeacherPage)
 
 # student's langing page
+@tracing.traced('gui')
 class StudentPage(tk.Frame):
     def __init__(self, parent,controller,db,student) -> None:
         self.controller = controller
@@ -556,6 +1064,7 @@ class StudentPage(tk.Frame):
         self.view_grades_button = tk.Button(self, text="View Grades Graph", command=self.view_grades,font=self.font2,height=1,width=20)
 
         self.logout_button = tk.Button(self, text="Logout", command=self.logout,width=20,bg='black',fg='white',font=self.font2)
+        self.course_widgets = []  # rebuilt by populate_enrolled_courses each time the page is shown
 
     def show(self):
         self.space.grid(row=0,column=0,columnspan=8,sticky='ew')
@@ -566,59 +1075,67 @@ class StudentPage(tk.Frame):
         self.logout_button.grid(row=3,column=1,columnspan=2,stick='ew')
         self.populate_enrolled_courses()
 
+    # reuse the page for the student who just logged in
+    def refresh(self, student: str) -> None:
+        self.student = student
+        self.label.config(text=f"Welcome, {self.student}!")
+
     def logout(self) -> None:
+        self.db.logout()
         self.controller.show_frame(LoginPage)
-        self.controller.frames.pop(StudentPage)
 
     # view the student's submissions and grades
     def view_submissions(self):
-        submissions = self.db.get_student_submissions(self.student)
-
-        if not submissions:
+        fetch_page = lambda after_id, limit: self.db.get_student_submissions_page(after_id, limit)
+        first_page = fetch_page(0, PAGE_SIZE)
+        if not first_page or isinstance(first_page, str):
             tk.messagebox.showinfo("Submissions", "You have no submissions.")
             return
 
         submission_window = tk.Toplevel(self)
         submission_window.title("Your Submissions")
 
-        cat1 = tk.Label(submission_window, text='Assignment ID:',font=self.font2,width=20,highlightbackground='black',highlightthickness='2',bg='grey',fg='white')
-        cat2 = tk.Label(submission_window,text='Submission:',font=self.font2,width=20,highlightbackground='black',highlightthickness='2',bg='grey',fg='white')
-        cat3 = tk.Label(submission_window,text='Grade:',font=self.font2,width=20,highlightbackground='black',highlightthickness='2',bg='grey',fg='white')
-        cat1.grid(column=0,row=0,sticky='ew')
-        cat2.grid(column=1,row=0,sticky='ew')
-        cat3.grid(column=2,row=0,sticky='ew')
-
-
-        for index, submission in enumerate(submissions, start=1):
-            tk.Label(submission_window, text=f"{submission[1]}",font=self.font2,highlightbackground='black',highlightthickness='2').grid(row=index, column=0,sticky='nesw')
-            tk.Label(submission_window, text=f"{submission[3]}",font=self.font2,highlightbackground='black',highlightthickness='2').grid(row=index, column=1,sticky='nesw')
-            tk.Label(submission_window, text=f"{submission[4]}",font=self.font2,highlightbackground='black',highlightthickness='2').grid(row=index, column=2,sticky='nesw')
+        table = PagedTable(submission_window, [('Assignment ID', 100), ('Submission', 360), ('Grade', 60)],
+                           lambda after_id, limit: first_page if after_id == 0 else fetch_page(after_id, limit))
+        table.grid(row=0, column=0, sticky='nsew')
+        table.load_more()
 
     # list the courses this student is in
     def populate_enrolled_courses(self) -> None:
-        courses = self.db.get_enrolled_courses_by_student(self.student)
+        for widget in self.course_widgets:
+            widget.destroy()
+        self.course_widgets = []
+        courses = self.db.get_enrolled_courses_by_student()
         if not courses:
-            tk.Label(self, text="You are not enrolled in any classes.").grid(row=3, column=4, columnspan=4)
+            label = tk.Label(self, text="You are not enrolled in any classes.")
+            label.grid(row=3, column=4, columnspan=4)
+            self.course_widgets.append(label)
             return
 
         for index, course in enumerate(courses, start=3):
             course_name = course[1]
-            tk.Button(self, text=course_name, command=lambda name=course_name: self.open_class(name),font=self.font2,bg='white').grid(
-                row=index, column=4, columnspan=4,sticky='ew')
+            button = tk.Button(self, text=course_name, command=lambda name=course_name: self.open_class(name),font=self.font2,bg='white')
+            button.grid(row=index, column=4, columnspan=4,sticky='ew')
+            self.course_widgets.append(button)
 
     # open the landing page for the class
     def open_class(self, course_name):
-        self.controller.frames[ClassPage] = ClassPage(self.parent,self.controller,self.db,self.student,course_name)
-        self.controller.show_frame(ClassPage)
+        self.controller.open_page(ClassPage, self.student, course_name)
 
     def view_grades(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import (
+            FigureCanvasTkAgg,
+            NavigationToolbar2Tk
+        )
+
         # filter ungraded assignments to show as 0s for now
         def filter_grade(grade) -> int:
             if grade == None:
                 return 0
             return grade
 
-        grades = self.db.get_student_grades(self.student)
+        grades = self.db.get_student_grades()
         if not grades:
             messagebox.showinfo("Grades", "You have no grades.")
             return
@@ -645,6 +1162,7 @@ class StudentPage(tk.Frame):
 
 
 # landing page for making a course
+@tracing.traced('gui')
 class CreateCoursePage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame, controller: Tk, db: Database, professor: str) -> None:
@@ -681,6 +1199,12 @@ class CreateCoursePage(tk.Frame):
         self.back_button.grid(row=4,column=1,columnspan=2,sticky='n')
         self.columnconfigure([1,2],pad=40)
 
+    # Purpose: To reuse the page with empty fields
+    def refresh(self, professor: str) -> None:
+        self.professor = professor
+        self.course_name_entry.delete(0, tk.END)
+        self.room_number_entry.delete(0, tk.END)
+
     # Purpose: To create the course
     def __create_course(self):
         course_name = self.course_name_entry.get()
@@ -690,17 +1214,17 @@ class CreateCoursePage(tk.Frame):
             tk.messagebox.showerror("Error", "Please fill in all fields.")
             return
 
-        self.db.add_course(course_name, self.professor, room_number)
+        self.db.add_course(course_name, room_number)
         tk.messagebox.showinfo("Success", "Class created successfully.")
         self.controller.show_frame(TeacherPage)
 
     # Purpose: To return to the Teacher Page
     def __back(self):
         self.controller.show_frame(TeacherPage)
-        self.controller.frames.pop(CreateCoursePage)
 
 
 # add assignment page
+@tracing.traced('gui')
 class AddAssignmentPage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame, controller: Tk, db: Database, professor: str, course_id):
@@ -739,10 +1263,16 @@ class AddAssignmentPage(tk.Frame):
         self.back_button.grid(row=4,column=1,columnspan=2)
         self.columnconfigure([1,2],pad=20)
 
+    # Purpose: To reuse the page for another course with empty fields
+    def refresh(self, professor: str, course_id) -> None:
+        self.professor = professor
+        self.course_id = course_id
+        self.assignment_name_entry.delete(0, tk.END)
+        self.description_entry.delete("1.0", tk.END)
+
     # Purpose: To return to previous page
     def __back(self):
         self.controller.show_frame(TeacherPage)
-        self.controller.frames.pop(AddAssignmentPage)
 
     # Purpose: add assignment action
     def __add_assignment(self) -> None:
@@ -759,6 +1289,7 @@ class AddAssignmentPage(tk.Frame):
 
 
 # page for viewing submissions
+@tracing.traced('gui')
 class ViewSubmissionsPage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame, controller: Tk, db: Database,professor: str,course_id) -> None:
@@ -774,53 +1305,62 @@ class ViewSubmissionsPage(tk.Frame):
         font = tkFont.Font(family='Arial', size=15, weight='bold')
         self.font2 = tkFont.Font(family='Arial',size=9,weight='bold')
         self.submissions_label = tk.Label(self, text="Submissions:",bg='RoyalBlue',fg='White',font=font)
+        self.table = PagedTable(self, [('Assignment', 130), ('Student', 110), ('Submission', 300), ('Grade', 70)],
+                                lambda after_id, limit: self.db.get_course_submissions_page(self.course_id, after_id,
+                                                                                            limit), height=11)
+        self.table.tree.bind('<Double-1>', self.__edit_grade)
+        self.hint_label = tk.Label(self, text="Double-click a grade to change it", font=self.font2)
+        self.grade_editor = None
         self.exit_button = tk.Button(self, text="Exit",command=self.__exit,width=12,bg='Red',fg='white',font=self.font2)
 
     # Purpose: To display widgets on window screen
     def show(self):
         self.space.grid(row=0,column=0,columnspan=8,sticky='ew')
         self.submissions_label.grid(row=1, column=0, columnspan=8,sticky='ew')
-        self.exit_button.grid(row=2,column=0, columnspan=8,stick='ew')
+        self.table.grid(row=2, column=0, columnspan=8, sticky='ew')
+        self.hint_label.grid(row=3, column=0, columnspan=8, sticky='ew')
+        self.exit_button.grid(row=4,column=0, columnspan=8,stick='ew')
         self.__populate_submissions()
 
+    # Purpose: To reuse the page for another course; the table reloads from the first page when shown
+    def refresh(self, professor: str, course_id) -> None:
+        self.professor = professor
+        self.course_id = course_id
+        self.__close_editor()
+        self.table.reset()
+
     # Purpose: To exit and return to Teacher Page
     def __exit(self):
         self.controller.show_frame(TeacherPage)
-        self.controller.frames.pop(ViewSubmissionsPage)
 
-    # Purpose: To fill the submissions into the page
+    # Purpose: To fill the first page of submissions into the table; later pages load as the teacher scrolls
     def __populate_submissions(self) -> None:
-        assignments = self.db.get_assignments_by_course(self.course_id)
-        index = 3
-        for assignment in assignments:
-
-            assignment_name = assignment[1]
-            tk.Label(self, text=f"{assignment_name} Submissions:",bg='white',font=self.font2).grid(row=index, column=0,
-                                                                                                   columnspan=8,sticky='ew')
-            submissions = self.db.get_submissions_by_assignment(assignment[0])
-
-            if submissions is not None:
-
-                for sub_index, submission in enumerate(submissions, start=index + 1):
-                    tk.Label(self, text=f"Student: {submission[2]}, Submission: {submission[3]}",font=self.font2).grid(
-                        row=sub_index,
-                        column=0,
-                        columnspan=6,
-                        sticky='ew')
-                    grade_entry = tk.Entry(self, width=5)
-                    grade_entry.grid(row=sub_index, column=6,sticky='ew')
-                    grade_entry.insert(0, str(submission[4]))  # Corrected the insert method call
-                    update_button = tk.Button(self, text="Update Grade", bg='RoyalBlue',fg='White',font=self.font2,
-                                              command=lambda submission_id=submission[0],
-                                                             grade_entry = grade_entry: self.__update_grade(
-                        submission_id, grade_entry))
-                    update_button.grid(row=sub_index, column=7,sticky='ew')
-                index = sub_index + 1
-
-            else:
-                tk.Label(self, text="No submissions yet",font=self.font2).grid(row=index + 1, column=0, columnspan=8,
-                                                                               sticky='ew')
-
+        if self.table.last_id == 0:
+            self.table.load_more()
+
+    # Purpose: To open an entry over the Grade cell of the double-clicked row
+    def __edit_grade(self, event) -> None:
+        tree = self.table.tree
+        row_id = tree.identify_row(event.y)
+        if not row_id:
+            return
+        self.__close_editor()
+        cell = tree.bbox(row_id, 'Grade')
+        if not cell:
+            return
+        x, y, width, height = cell
+        self.grade_editor = tk.Entry(tree, width=5)
+        self.grade_editor.place(x=x, y=y, width=width, height=height)
+        self.grade_editor.insert(0, tree.set(row_id, 'Grade'))
+        self.grade_editor.select_range(0, tk.END)
+        self.grade_editor.focus_set()
+        self.grade_editor.bind('<Return>', lambda e: self.__update_grade(int(row_id), self.grade_editor))
+        self.grade_editor.bind('<Escape>', lambda e: self.__close_editor())
+
+    def __close_editor(self) -> None:
+        if self.grade_editor is not None:
+            self.grade_editor.destroy()
+            self.grade_editor = None
 
     # Purpose: To update the new grade with error checks
     def __update_grade(self, submission_id, grade_entry):
@@ -836,10 +1376,13 @@ class ViewSubmissionsPage(tk.Frame):
             return
 
         self.db.grade_submission(submission_id, new_grade)
+        self.table.set_cell(submission_id, 'Grade', new_grade)
+        self.__close_editor()
         tk.messagebox.showinfo("Success", "Grade updated successfully.")
 
 
 # landing page for a class
+@tracing.traced('gui')
 class ClassPage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame, controller: Tk, db: Database,student: str,course_name: str) -> None:
@@ -856,7 +1399,7 @@ class ClassPage(tk.Frame):
         self.space = tk.Frame(self, width=640)
         self.assignment_label = tk.Label(self, text="Assignments:",bg='RoyalBlue', fg='White', font=font)
         self.exit_button = tk.Button(self, text="Exit",command=self.__exit,bg='Red',fg='white',font=self.font2)
-
+        self.assignment_buttons = []
 
     # Purpose: To display widgets on window screen
     def show(self) -> None:
@@ -865,13 +1408,20 @@ class ClassPage(tk.Frame):
         self.exit_button.grid(row=1,column=0,sticky='ew')
         self.__populate_assignments()
 
+    # Purpose: To reuse the page for another class
+    def refresh(self, student: str, course_name: str) -> None:
+        self.student = student
+        self.course_name = course_name
+
     # Purpose: To exit and return to Student Page
     def __exit(self):
         self.controller.show_frame(StudentPage)
-        self.controller.frames.pop(ClassPage)
 
     # Purpose: To fill in the assignments
     def __populate_assignments(self):
+        for button in self.assignment_buttons:
+            button.destroy()
+        self.assignment_buttons = []
         course_id = self.db.get_course_id_by_name(self.course_name)[0]
         assignments = [self.db.get_assignments_by_course(course_id)]
         # for index, assignment in enumerate(assignments, start=1):
@@ -880,19 +1430,19 @@ class ClassPage(tk.Frame):
             for index, assignment in enumerate(a, start=2):
                 assignment_name = assignment[1]
                 assignment_desc = assignment[2]
-                tk.Button(self, text=assignment_name,
-                          command=lambda name=assignment_name, desc=assignment_desc: self.__submit_assignment(name, desc),
-                          font=self.font2,bg=bgs[index % 2],fg=bgs[(index + 1)%2]).grid(
-                    row=index, column=2, columnspan=4, sticky='ew')
+                button = tk.Button(self, text=assignment_name,
+                                   command=lambda name=assignment_name, desc=assignment_desc: self.__submit_assignment(name, desc),
+                                   font=self.font2,bg=bgs[index % 2],fg=bgs[(index + 1)%2])
+                button.grid(row=index, column=2, columnspan=4, sticky='ew')
+                self.assignment_buttons.append(button)
 
     # Purpose: To open submission page
     def __submit_assignment(self, assignment_name, desc):
-        self.controller.frames[SubmitAssignmentPage] = SubmitAssignmentPage(self.parent,self.controller,self.db,self.student,
-                                                                            assignment_name,desc)
-        self.controller.show_frame(SubmitAssignmentPage)
+        self.controller.open_page(SubmitAssignmentPage, self.student, assignment_name, desc)
 
 
 # page for submitting assignments
+@tracing.traced('gui')
 class SubmitAssignmentPage(tk.Frame):
     # Constructor
     def __init__(self, parent: Frame, controller: Tk, db: Database,student: str,assignment_name: str,desc: str) -> None:
@@ -933,10 +1483,17 @@ class SubmitAssignmentPage(tk.Frame):
         self.back_button.grid(row=4,column=1,columnspan=2)
         self.columnconfigure([1,2],pad=20)
 
+    # Purpose: To reuse the page for another assignment with an empty submission
+    def refresh(self, student: str, assignment_name: str, desc: str) -> None:
+        self.student = student
+        self.assignment_name = assignment_name
+        self.desc = desc
+        self.desc_label2.config(text=self.desc)
+        self.body_entry.delete("1.0", tk.END)
+
     # Purpose: To return to previous page
     def __back(self):
         self.controller.show_frame(ClassPage)
-        self.controller.frames.pop(SubmitAssignmentPage)
 
     # Purpose: To upload the submission
     def __submit(self):
@@ -947,14 +1504,17 @@ class SubmitAssignmentPage(tk.Frame):
             return
 
         assignment_id = self.db.get_assignment_id_by_name(self.assignment_name)[0]
-        self.db.add_submission(assignment_id, self.student, body)
+        self.db.add_submission(assignment_id, body)
         tk.messagebox.showinfo("Success", "Submission successful.")
         self.controller.show_frame(StudentPage)
 
+@tracing.traced('gui')
 class ViewStaffPage:
-    def __init__(self, master):
+    def __init__(self, master, directory=None):
+        import faculty
         self.master = master
         self.master.title("Student Options")
+        self.directory = directory if directory is not None else faculty.shared_directory()
 
         self.option_var = tk.StringVar()
         self.option_var.set("")  # Set default option
@@ -962,15 +1522,7 @@ class ViewStaffPage:
         self.option_label = tk.Label(master, text="Select an option:")
         self.option_label.pack()
 
-        self.options = [
-                "Business",
-                "Arts and Sciences",
-                "Diplomacy",
-                "Health",
-                "Nursing",
-                "Human Development and Culture",
-                "Theology"
-            ]
+        self.options = list(faculty.COLLEGES)
 
         self.option_menu = tk.OptionMenu(master, self.option_var, *self.options)
         self.option_menu.pack()
@@ -978,6 +1530,17 @@ class ViewStaffPage:
         self.select_button = tk.Button(master, text="Select", command=self.show_message)
         self.select_button.pack()
 
+        self.search_label = tk.Label(master, text="Or search all colleges:")
+        self.search_label.pack()
+        self.search_entry = tk.Entry(master)
+        self.search_entry.pack()
+        self.search_entry.bind('<Return>', lambda event: self.search())
+        self.search_button = tk.Button(master, text="Search", command=self.search)
+        self.search_button.pack()
+
+        self.status_label = tk.Label(master, text="")
+        self.status_label.pack()
+
         # Show a message as a scrollable popup
     def show_scrollable_message(self, message: str) -> None:
         top = tk.Toplevel(self.master)
@@ -987,36 +1550,63 @@ class ViewStaffPage:
         text.insert(tk.END, message)
         text.configure(state='disabled')
 
-    # generate the message to show by scraping the appropriate shu.edu subpage
+    # look up the faculty for the chosen college; the page is fetched off the Tk thread when it isn't cached
     def show_message(self):
+        import faculty
         selected_option = self.option_var.get()
-        choose = {
-                "Business": "https://www.shu.edu/business/faculty.html",
-                "Arts and Sciences": "https://www.shu.edu/arts-sciences/faculty.html",
-                "Diplomacy": "https://www.shu.edu/diplomacy/faculty.html",
-                "Health": "https://www.shu.edu/health/faculty.html",
-                "Nursing": "https://www.shu.edu/nursing/faculty.html",
-                "Human Development and Culture": "https://www.shu.edu/human-development-culture-media/faculty.html",
-                "Theology": "https://www.shu.edu/theology/faculty.html"
-            }
-        # HTTP GET Request
-        page = requests.get(choose[selected_option], headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/80.0.3987.163 Safari/537.36'})
-        facultylist = []
-        # Parse HTML data
-        soup = BeautifulSoup(page.text, 'html.parser')
-        # Find all <strong> tag objects of the title class
-        data = soup.findAll('strong', {"class": "title"})
-        # find each <a> tag object and extract the text from that
-        for i in data:
-            faculty = i.find('a')
-            if faculty:
-                facultylist.append(faculty.text)
-            # add each item of the list to the string on a newline
+        if selected_option not in faculty.COLLEGES:
+            tk.messagebox.showerror("Error", "Please select an option.")
+            return
+        future = self.directory.lookup(selected_option)
+        if not future.done():
+            self.status_label.config(text=f"Loading {selected_option} faculty...")
+        self.__wait_for(selected_option, future)
+
+    # search every college's faculty by name, waiting for the prefetch if it hasn't finished yet
+    def search(self) -> None:
+        text = self.search_entry.get().strip()
+        if not text:
+            tk.messagebox.showerror("Error", "Please enter a name to search for.")
+            return
+        future = self.directory.prefetch()
+        if not future.done():
+            self.status_label.config(text="Loading faculty lists...")
+        self.__wait_for_search(text, future)
+
+    def __wait_for_search(self, text: str, future) -> None:
+        if not future.done():
+            self.master.after(100, self.__wait_for_search, text, future)
+            return
+        self.status_label.config(text="")
+        matches = self.directory.search(text)
+        message = '\n'.join(f"{name} ({college})" for name, college in matches)
+        failures = future.result()
+        if failures:
+            message += "\n\nCould not load: " + ', '.join(failures)
+        self.show_scrollable_message(f"Faculty members matching '{text}':\n" + (message or "No matches."))
+
+    # poll the background fetch from the Tk event loop, which is the only thread allowed to touch widgets
+    def __wait_for(self, selected_option: str, future) -> None:
+        if not future.done():
+            self.master.after(100, self.__wait_for, selected_option, future)
+            return
+        self.status_label.config(text="")
+        try:
+            facultylist = future.result()
+        except Exception as e:
+            tk.messagebox.showerror("Error", f"Could not load the {selected_option} faculty list:\n{e}")
+            return
+        # add each item of the list to the string on a newline
         facultystring = '\n'.join(str(x) for x in facultylist)
 
         self.show_scrollable_message(f"Here is a list of faculty members for {selected_option}:\n" + facultystring)
 
+# import the faculty scraper and start its prefetch off the main thread, so the login page isn't kept waiting
+def warm_faculty_directory() -> None:
+    import faculty
+    faculty.shared_directory().start_refresh()
+
+
 def reset_system():
     conn = sqlite3.connect('collegeMGMTsystem.db')
     cursor = conn.cursor()
@@ -1043,9 +1633,12 @@ if __name__ == "__main__":
     # db.add_user("student", "password", "Student", "01/01/1995", "student@example.com", "0987654321", "Jane", "Doe")
     #reset_system()
 
+    threading.Thread(target=warm_faculty_directory, daemon=True).start()
+
     app = SystemGUIManager(db)
 
     app.mainloop()
+    db.close_connection()
 
 
 
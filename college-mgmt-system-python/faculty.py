@@ -0,0 +1,204 @@
+# faculty.py
+# Faculty directory scraped from the shu.edu college pages.
+#
+# Lookups are answered from an on-disk cache when it is fresh; otherwise the page is fetched on a
+# background thread with a conditional GET (ETag / Last-Modified), so an unchanged page costs a 304
+# and no parsing. prefetch() loads every college in parallel over one keep-alive session, and search()
+# looks names up across all of them. Point FACULTY_BASE_URL (or base_url) at a local server to test
+# without shu.edu.
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+import requests.adapters
+from bs4 import BeautifulSoup, SoupStrainer
+
+BASE_URL = os.environ.get('FACULTY_BASE_URL', 'https://www.shu.edu')
+CACHE_PATH = 'faculty_cache.json'
+CACHE_TTL = 24 * 60 * 60  # seconds a fetched list is used without asking the server again
+REFRESH_INTERVAL = 6 * 60 * 60  # seconds between background revalidations of every college
+TIMEOUT = 10
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/80.0.3987.163 Safari/537.36'}
+
+COLLEGES = {
+    "Business": "/business/faculty.html",
+    "Arts and Sciences": "/arts-sciences/faculty.html",
+    "Diplomacy": "/diplomacy/faculty.html",
+    "Health": "/health/faculty.html",
+    "Nursing": "/nursing/faculty.html",
+    "Human Development and Culture": "/human-development-culture-media/faculty.html",
+    "Theology": "/theology/faculty.html",
+}
+
+
+# while parsing, the strainer sees the raw class attribute ("title big"), so match the word rather than the string
+def has_title_class(classes) -> bool:
+    return classes is not None and 'title' in classes.split()
+
+
+# only the <strong class="title"> elements are built into a tree, the rest of the page is skipped
+TITLES = SoupStrainer('strong', class_=has_title_class)
+
+
+# Purpose: pull faculty names out of a college faculty page
+def parse_faculty(html: str) -> list:
+    soup = BeautifulSoup(html, 'html.parser', parse_only=TITLES)
+    names = []
+    for title in soup.find_all('strong'):
+        faculty = title.find('a')
+        if faculty:
+            names.append(faculty.text)
+    return names
+
+
+class FacultyDirectory:
+    def __init__(self, base_url: str = BASE_URL, cache_path: str = CACHE_PATH, ttl: float = CACHE_TTL,
+                 workers: int = len(COLLEGES)) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.lock = threading.RLock()  # reentrant: a fetch that is already done runs its callback under lookup's lock
+        self.entries = self.__load()  # college -> {names, fetched_at, etag, last_modified}
+        self.session = requests.Session()  # keep-alive across fetches
+        self.session.headers.update(HEADERS)
+        # every college is on the same host, so let all workers hold a kept-alive connection at once
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='faculty')
+        self.inflight = {}  # college -> Future, so repeated clicks share one fetch
+        self.index = None  # (lowercased name, name, college) for every loaded college, rebuilt after a fetch
+        self.refresher = None
+
+    def __load(self) -> dict:
+        try:
+            with open(self.cache_path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def __save(self) -> None:
+        temp_path = self.cache_path + '.tmp'
+        with open(temp_path, 'w') as cache_file:
+            json.dump(self.entries, cache_file)
+        os.replace(temp_path, self.cache_path)  # readers never see a half-written file
+
+    def url(self, college: str) -> str:
+        return self.base_url + COLLEGES[college]
+
+    # Purpose: cached names for the college if they are still within the TTL, else None
+    def cached(self, college: str):
+        with self.lock:
+            entry = self.entries.get(college)
+        if entry and time.time() - entry['fetched_at'] < self.ttl:
+            return entry['names']
+        return None
+
+    # Purpose: fetch (or revalidate) one college's list; blocks, so call it off the Tk thread
+    def fetch(self, college: str) -> list:
+        with self.lock:
+            entry = self.entries.get(college)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        page = self.session.get(self.url(college), headers=headers, timeout=TIMEOUT)
+        if page.status_code == 304 and entry:
+            names = entry['names']  # unchanged since last time, nothing to parse
+        else:
+            page.raise_for_status()
+            names = parse_faculty(page.text)
+        with self.lock:
+            self.entries[college] = {
+                'names': names,
+                'fetched_at': time.time(),
+                'etag': page.headers.get('ETag', entry.get('etag') if entry else None),
+                'last_modified': page.headers.get('Last-Modified', entry.get('last_modified') if entry else None),
+            }
+            self.index = None
+            self.__save()
+        return names
+
+    # Purpose: return a Future with the college's names, already resolved when the cache is fresh
+    def lookup(self, college: str, force: bool = False) -> Future:
+        names = None if force else self.cached(college)
+        if names is not None:
+            future = Future()
+            future.set_result(names)
+            return future
+        with self.lock:
+            future = self.inflight.get(college)
+            if future is None:
+                future = self.inflight[college] = self.executor.submit(self.fetch, college)
+                future.add_done_callback(lambda done: self.__finished(college, done))
+        return future
+
+    def __finished(self, college: str, future: Future) -> None:
+        with self.lock:
+            if self.inflight.get(college) is future:
+                del self.inflight[college]
+
+    # Purpose: load every college at once; the returned Future resolves, with a {college: error} dict of
+    # the pages that failed, when the slowest page is done. force revalidates even fresh cache entries
+    def prefetch(self, force: bool = False) -> Future:
+        done = Future()
+        pending = [len(COLLEGES)]
+        failures = {}
+
+        def finished(college: str, future: Future) -> None:
+            with self.lock:
+                if future.exception() is not None:
+                    failures[college] = future.exception()
+                pending[0] -= 1
+                last = pending[0] == 0
+            if last:
+                done.set_result(failures)
+
+        for college in COLLEGES:
+            self.lookup(college, force).add_done_callback(lambda future, college=college: finished(college, future))
+        return done
+
+    # Purpose: prefetch now and then revalidate everything every interval seconds on a daemon thread
+    def start_refresh(self, interval: float = REFRESH_INTERVAL) -> None:
+        if self.refresher is not None:
+            return
+
+        def refresh_loop() -> None:
+            force = False
+            while True:
+                self.prefetch(force).result()
+                force = True
+                time.sleep(interval)
+
+        self.refresher = threading.Thread(target=refresh_loop, name='faculty-refresh', daemon=True)
+        self.refresher.start()
+
+    # Purpose: case-insensitive substring search over every loaded college; returns (name, college) pairs
+    def search(self, text: str) -> list:
+        with self.lock:
+            if self.index is None:
+                self.index = [(name.lower(), name, college)
+                              for college, entry in self.entries.items() for name in entry['names']]
+            index = self.index
+        text = text.strip().lower()
+        return [(name, college) for lowered, name, college in index if text in lowered]
+
+
+directory = None
+directory_lock = threading.Lock()  # the startup warm-up thread and the Tk thread can both ask first
+
+
+# Purpose: the process-wide directory, created on first use
+def shared_directory() -> FacultyDirectory:
+    global directory
+    if directory is None:
+        with directory_lock:
+            if directory is None:
+                directory = FacultyDirectory()
+    return directory
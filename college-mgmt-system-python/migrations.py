@@ -0,0 +1,94 @@
+# migrations.py
+# Versioned schema for collegeMGMTsystem.db.
+#
+# The applied version is stored in SQLite's user_version header field. To change the schema, append a
+# new (version, description, statements) entry; never edit one that has already shipped. Statements
+# should be idempotent (IF NOT EXISTS) so databases created before versioning upgrade cleanly.
+import sqlite3
+
+MIGRATIONS = [
+    (1, 'base tables', [
+        '''CREATE TABLE IF NOT EXISTS Users (
+                ID INTEGER PRIMARY KEY,
+                Username TEXT UNIQUE,
+                Password TEXT,
+                Privilege TEXT,
+                DOB TEXT,
+                Email TEXT,
+                Phone TEXT,
+                FName TEXT,
+                LName TEXT
+            )''',
+        '''CREATE TABLE IF NOT EXISTS Courses (
+                CourseID INTEGER PRIMARY KEY,
+                CourseName TEXT,
+                LOStudents INTEGER,
+                Professor TEXT,
+                RoomNumber TEXT
+            )''',
+        '''CREATE TABLE IF NOT EXISTS Assignments (
+                AssignmentID INTEGER PRIMARY KEY,
+                Name TEXT,
+                Description TEXT,
+                CourseID INTEGER,
+                FOREIGN KEY (CourseID) REFERENCES Courses(CourseID)
+            )''',
+        '''CREATE TABLE IF NOT EXISTS Submissions (
+                ID INTEGER PRIMARY KEY,
+                AssignmentID INTEGER,
+                SubmitterID INTEGER,
+                Body TEXT,
+                Grade INTEGER,
+                FOREIGN KEY (AssignmentID) REFERENCES Assignments(AssignmentID),
+                FOREIGN KEY (SubmitterID) REFERENCES Users(ID)
+            )''',
+        '''CREATE TABLE IF NOT EXISTS Enrollments (
+                EnrollmentID INTEGER PRIMARY KEY,
+                CourseID INTEGER,
+                StudentID INTEGER,
+                FOREIGN KEY (CourseID) REFERENCES Courses(CourseID),
+                FOREIGN KEY (StudentID) REFERENCES Users(ID)
+            )''',
+    ]),
+    # Users.Username already has the index behind its UNIQUE constraint, which also serves authenticate_user
+    (2, 'indexes for hot lookups', [
+        'CREATE INDEX IF NOT EXISTS idx_users_privilege ON Users (Privilege)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_professor ON Courses (Professor)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_name ON Courses (CourseName)',
+        'CREATE INDEX IF NOT EXISTS idx_assignments_course ON Assignments (CourseID)',
+        'CREATE INDEX IF NOT EXISTS idx_assignments_name ON Assignments (Name)',
+        'CREATE INDEX IF NOT EXISTS idx_submissions_assignment ON Submissions (AssignmentID)',
+        'CREATE INDEX IF NOT EXISTS idx_submissions_submitter ON Submissions (SubmitterID)',
+        'CREATE INDEX IF NOT EXISTS idx_enrollments_student_course ON Enrollments (StudentID, CourseID)',
+        'CREATE INDEX IF NOT EXISTS idx_enrollments_course ON Enrollments (CourseID)',
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+VERSION_QUERY = 'SELECT user_version FROM pragma_user_version'
+
+
+# Purpose: the migrations a database at the given version still needs, in order
+def pending(version: int) -> list:
+    return [migration for migration in MIGRATIONS if migration[0] > version]
+
+
+# Purpose: the statements that bring a database from `version` to the latest, including the version bumps
+def upgrade_statements(version: int) -> list:
+    statements = []
+    for number, _, steps in pending(version):
+        statements.extend(steps)
+        statements.append(f'PRAGMA user_version = {number}')
+    return statements
+
+
+# Purpose: migrate a local sqlite3 connection directly, in one transaction; returns the new version
+def migrate_connection(db_connection: sqlite3.Connection) -> int:
+    version = db_connection.execute(VERSION_QUERY).fetchone()[0]
+    statements = upgrade_statements(version)
+    if statements:
+        with db_connection:
+            db_connection.execute('BEGIN')
+            for statement in statements:
+                db_connection.execute(statement)
+    return max(version, LATEST_VERSION)
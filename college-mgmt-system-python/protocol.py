@@ -0,0 +1,323 @@
+# protocol.py
+# Wire format shared by college-mgmt-system.py and college-mgmt-system-server.py.
+#
+# Every message is a fixed header followed by a payload:
+#   magic (2 bytes) | version (1 byte) | message type (1 byte) | payload length (4 bytes, big endian)
+# Row payloads hold typed values so results decode with struct instead of parsing a Python repr.
+# The SQL text helpers at the end are shared by the client's and the server's result caches.
+import functools
+import re
+import struct
+
+MAGIC = b'CM'
+VERSION = 2
+HEADER = struct.Struct('!2sBBI')
+MAX_PAYLOAD = 256 * 1024 * 1024
+
+# message types
+QUERY = 1  # client -> server: SQL template plus bound parameters
+ROWS = 2  # server -> client: result rows of a SELECT
+OK = 3  # server -> client: statement ran, nothing to return
+ERROR = 4  # server -> client: error message
+STATS = 5  # client -> server: ask for server metrics, answered with ROWS of (name, value)
+BATCH = 6  # client -> server: several queries run in one transaction; server -> client: one reply per query
+STREAM = 7  # client -> server: a SELECT whose rows come back as a series of ROWS chunks
+DONE = 8  # server -> client: end of a STREAM
+LOGIN = 9  # client -> server: (username, password) row; answered with ROWS of (token, user id, username, privilege)
+# client -> server: a session token that the socket's later QUERY / BATCH / STREAM messages run as (empty unbinds);
+# answered with ROWS of (user id, username, privilege) while it is live
+SESSION = 10
+LOGOUT = 11  # client -> server: a session token to end; answered with OK
+METRICS = 12  # client -> server: admin request for per-query-template metrics, answered with ROWS
+
+# value tags used inside row payloads
+NULL = 0
+INT = 1
+FLOAT = 2
+TEXT = 3
+BLOB = 4
+
+_COUNT = struct.Struct('!I')
+_ROWS_HEADER = struct.Struct('!IH')  # row count, column count
+_INT = struct.Struct('!q')
+_FLOAT = struct.Struct('!d')
+_TAGGED_INT = struct.Struct('!Bq')
+_TAGGED_FLOAT = struct.Struct('!Bd')
+_TAGGED_LENGTH = struct.Struct('!BI')
+_TAGGED_NULL = bytes((NULL,))
+_REPLY_HEADER = struct.Struct('!BI')  # message type, payload length
+
+
+class ProtocolError(Exception):
+    pass
+
+
+# Purpose: decorator for the payload decoders: a truncated or garbled payload surfaces as ProtocolError, not as
+# whatever struct, indexing or UTF-8 decoding happened to raise first
+def _decoder(function):
+    @functools.wraps(function)
+    def decode(payload):
+        try:
+            return function(payload)
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise ProtocolError(f"malformed payload: {e}") from None
+    return decode
+
+
+# Purpose: turn one Python value into its tagged byte form
+def _encode_value(value, out: list) -> None:
+    if value is None:
+        out.append(_TAGGED_NULL)
+    elif isinstance(value, int):
+        out.append(_TAGGED_INT.pack(INT, value))
+    elif isinstance(value, float):
+        out.append(_TAGGED_FLOAT.pack(FLOAT, value))
+    elif isinstance(value, str):
+        data = value.encode()
+        out.append(_TAGGED_LENGTH.pack(TEXT, len(data)))
+        out.append(data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        out.append(_TAGGED_LENGTH.pack(BLOB, len(data)))
+        out.append(data)
+    else:
+        raise ProtocolError(f"cannot encode value of type {type(value).__name__}")
+
+
+# Purpose: read one tagged value starting at offset; returns the value and the next offset
+def _decode_value(buf, offset: int) -> tuple:
+    tag = buf[offset]
+    offset += 1
+    if tag == NULL:
+        return None, offset
+    if tag == INT:
+        return _INT.unpack_from(buf, offset)[0], offset + 8
+    if tag == FLOAT:
+        return _FLOAT.unpack_from(buf, offset)[0], offset + 8
+    if tag == TEXT or tag == BLOB:
+        (length,) = _COUNT.unpack_from(buf, offset)
+        offset += 4
+        data = bytes(buf[offset:offset + length])
+        if len(data) != length:
+            raise ProtocolError("value runs past end of payload")
+        return (data.decode() if tag == TEXT else data), offset + length
+    raise ProtocolError(f"unknown value tag {tag}")
+
+
+# Purpose: encode a list of row tuples (as returned by cursor.fetchall)
+def encode_rows(rows: list) -> bytes:
+    width = len(rows[0]) if rows else 0
+    out = [_ROWS_HEADER.pack(len(rows), width)]
+    for row in rows:
+        if len(row) != width:
+            raise ProtocolError("rows must all have the same number of columns")
+        for value in row:
+            _encode_value(value, out)
+    return b''.join(out)
+
+
+# Purpose: number of rows in a row payload, read from its header without decoding the values
+@_decoder
+def row_count(payload) -> int:
+    return _ROWS_HEADER.unpack_from(payload, 0)[0]
+
+
+# Purpose: decode a row payload back into a list of tuples
+@_decoder
+def decode_rows(payload) -> list:
+    buf = memoryview(payload)
+    count, width = _ROWS_HEADER.unpack_from(buf, 0)
+    offset = _ROWS_HEADER.size
+    rows = []
+    for _ in range(count):
+        row = []
+        for _ in range(width):
+            value, offset = _decode_value(buf, offset)
+            row.append(value)
+        rows.append(tuple(row))
+    if offset != len(buf):
+        raise ProtocolError("trailing bytes after rows")
+    return rows
+
+
+# Purpose: encode a SQL template and its parameters; values are bound on the server, never spliced into the text
+def encode_query(sql: str, params=()) -> bytes:
+    data = sql.encode()
+    out = [_COUNT.pack(len(data)), data, _COUNT.pack(len(params))]
+    for value in params:
+        _encode_value(value, out)
+    return b''.join(out)
+
+
+# Purpose: decode a query payload into (sql, params)
+@_decoder
+def decode_query(payload) -> tuple:
+    buf = memoryview(payload)
+    (length,) = _COUNT.unpack_from(buf, 0)
+    offset = _COUNT.size
+    if offset + length > len(buf):
+        raise ProtocolError("query text runs past end of payload")
+    sql = bytes(buf[offset:offset + length]).decode()
+    offset += length
+    (count,) = _COUNT.unpack_from(buf, offset)
+    offset += _COUNT.size
+    params = []
+    for _ in range(count):
+        value, offset = _decode_value(buf, offset)
+        params.append(value)
+    if offset != len(buf):
+        raise ProtocolError("trailing bytes after query parameters")
+    return sql, tuple(params)
+
+
+# Purpose: encode a STREAM request: rows per chunk, then the query
+def encode_stream(sql: str, params=(), chunk_size: int = 500) -> bytes:
+    return _COUNT.pack(chunk_size) + encode_query(sql, params)
+
+
+# Purpose: decode a STREAM request into (sql, params, chunk_size)
+@_decoder
+def decode_stream(payload) -> tuple:
+    buf = memoryview(payload)
+    (chunk_size,) = _COUNT.unpack_from(buf, 0)
+    sql, params = decode_query(buf[_COUNT.size:])
+    return sql, params, max(chunk_size, 1)
+
+
+# Purpose: encode a list of (sql, params) pairs for a BATCH request
+def encode_batch(statements: list) -> bytes:
+    out = [_COUNT.pack(len(statements))]
+    for sql, params in statements:
+        data = encode_query(sql, params)
+        out.append(_COUNT.pack(len(data)))
+        out.append(data)
+    return b''.join(out)
+
+
+# Purpose: decode a BATCH request back into a list of (sql, params) pairs
+@_decoder
+def decode_batch(payload) -> list:
+    buf = memoryview(payload)
+    (count,) = _COUNT.unpack_from(buf, 0)
+    offset = _COUNT.size
+    statements = []
+    for _ in range(count):
+        (length,) = _COUNT.unpack_from(buf, offset)
+        offset += _COUNT.size
+        if offset + length > len(buf):
+            raise ProtocolError("statement runs past end of batch")
+        statements.append(decode_query(buf[offset:offset + length]))
+        offset += length
+    if offset != len(buf):
+        raise ProtocolError("trailing bytes after batch")
+    return statements
+
+
+# Purpose: encode the per-statement (type, payload) replies of a BATCH
+def encode_batch_results(replies: list) -> bytes:
+    out = [_COUNT.pack(len(replies))]
+    for msg_type, payload in replies:
+        out.append(_REPLY_HEADER.pack(msg_type, len(payload)))
+        out.append(payload)
+    return b''.join(out)
+
+
+# Purpose: decode a BATCH reply into a list of (type, payload) pairs
+@_decoder
+def decode_batch_results(payload) -> list:
+    buf = memoryview(payload)
+    (count,) = _COUNT.unpack_from(buf, 0)
+    offset = _COUNT.size
+    replies = []
+    for _ in range(count):
+        msg_type, length = _REPLY_HEADER.unpack_from(buf, offset)
+        offset += _REPLY_HEADER.size
+        if offset + length > len(buf):
+            raise ProtocolError("reply runs past end of batch")
+        replies.append((msg_type, bytes(buf[offset:offset + length])))
+        offset += length
+    return replies
+
+
+# Purpose: build the bytes for one framed message
+def pack_message(msg_type: int, payload: bytes = b'') -> bytes:
+    if len(payload) > MAX_PAYLOAD:
+        raise ProtocolError(f"payload of {len(payload)} bytes is too large")
+    return HEADER.pack(MAGIC, VERSION, msg_type, len(payload)) + payload
+
+
+# Purpose: check a header and return (message type, payload length)
+def unpack_header(header: bytes) -> tuple:
+    magic, version, msg_type, length = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ProtocolError("bad magic bytes, not a college-mgmt-system peer")
+    if version != VERSION:
+        raise ProtocolError(f"protocol version {version} is not supported (expected {VERSION})")
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"payload of {length} bytes is too large")
+    return msg_type, length
+
+
+# Purpose: read exactly n bytes from a socket, looping over partial reads
+def recv_exact(sock, n: int) -> bytearray:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    received = 0
+    while received < n:
+        count = sock.recv_into(view[received:], n - received)
+        if count == 0:
+            raise ConnectionResetError("connection closed mid-message")
+        received += count
+    return buf
+
+
+def send_message(sock, msg_type: int, payload: bytes = b'') -> None:
+    sock.sendall(pack_message(msg_type, payload))
+
+
+# Purpose: read one whole message; returns None if the peer closed cleanly between messages
+def recv_message(sock):
+    first = sock.recv(HEADER.size)
+    if not first:
+        return None
+    header = first if len(first) == HEADER.size else first + recv_exact(sock, HEADER.size - len(first))
+    msg_type, length = unpack_header(bytes(header))
+    payload = recv_exact(sock, length) if length else b''
+    return msg_type, payload
+
+
+# Purpose: asyncio counterpart of recv_message for a StreamReader
+async def read_message(reader):
+    import asyncio  # only the async server engine needs it; keeps the client's startup light
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ConnectionResetError("connection closed mid-message")
+    msg_type, length = unpack_header(header)
+    try:
+        payload = await reader.readexactly(length) if length else b''
+    except asyncio.IncompleteReadError:
+        raise ConnectionResetError("connection closed mid-message")
+    return msg_type, payload
+
+
+# FROM / JOIN followed by a table, or a comma list of them with optional aliases ("FROM Courses c, Enrollments e")
+READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+((?:\w+(?:\s+(?:AS\s+)?\w+)?\s*,\s*)*\w+)', re.IGNORECASE)
+# INSERT / REPLACE / UPDATE with an optional OR <conflict> clause, or DELETE, then an optionally schema-qualified
+# table whose name has to end there; quoted names and anything behind a WITH don't match
+WRITE_TABLE = re.compile(r'^\s*(?:(?:INSERT|REPLACE)(?:\s+OR\s+\w+)?\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)'
+                         r'\s+(?:\w+\s*\.\s*)?(\w+)(?=[\s(;]|$)', re.IGNORECASE)
+
+
+# Purpose: lowercased names of the tables a SELECT reads, going by its text; the server asks SQLite instead
+def read_tables(query: str) -> frozenset:
+    return frozenset(item.split()[0].lower() for clause in READ_TABLES.findall(query) for item in clause.split(','))
+
+
+# Purpose: lowercased table an INSERT / UPDATE / DELETE / REPLACE names, or None for anything it can't be sure of
+# (DDL, PRAGMA, CTEs). Triggers and foreign key actions can change other tables too; the server asks SQLite instead
+def written_table(query: str):
+    match = WRITE_TABLE.match(query)
+    return match.group(1).lower() if match else None
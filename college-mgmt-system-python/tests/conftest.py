@@ -0,0 +1,44 @@
+# conftest.py
+# Starts college-mgmt-system-server.py on a scratch database for the tests that talk to it over a socket.
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'college-mgmt-system-server.py')
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+# a function that starts the server in a directory holding its collegeMGMTsystem.db and returns the port;
+# every server it started is killed when the test ends
+@pytest.fixture
+def start_server():
+    processes = []
+
+    def start(cwd, *args) -> int:
+        port = free_port()
+        process = subprocess.Popen([sys.executable, SERVER, '--port', str(port), *args], cwd=cwd,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        processes.append(process)
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                return port
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    yield start
+    for process in processes:
+        process.kill()
+        process.wait()
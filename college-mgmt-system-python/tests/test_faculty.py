@@ -0,0 +1,20 @@
+# test_faculty.py
+# Parsing of the shu.edu faculty pages.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faculty  # noqa: E402
+
+
+def test_parse_faculty_matches_multi_class_titles():
+    html = '''<div>
+        <strong class="title"><a href="/a">Ann Lee</a></strong>
+        <strong class="title big"><a href="/b">Bo</a></strong>
+        <strong class="big title"><a href="/c">Cy</a></strong>
+        <strong class="subtitle"><a href="/d">Not faculty</a></strong>
+        <strong><a href="/e">No class</a></strong>
+        <span class="title"><a href="/f">Not strong</a></span>
+    </div>'''
+    assert faculty.parse_faculty(html) == ['Ann Lee', 'Bo', 'Cy']
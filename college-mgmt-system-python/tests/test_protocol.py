@@ -0,0 +1,37 @@
+# test_protocol.py
+# Truncated payloads must decode to a ProtocolError, which the server answers with ERROR.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import protocol  # noqa: E402
+
+
+@pytest.mark.parametrize('decode, payload', [
+    (protocol.decode_query, protocol.encode_query('SELECT * FROM Users WHERE ID = ?', (1,))),
+    (protocol.decode_stream, protocol.encode_stream('SELECT * FROM Users WHERE ID = ?', (1,))),
+    (protocol.decode_batch, protocol.encode_batch([('UPDATE Users SET Phone = ? WHERE ID = ?', ('555', 1))])),
+    (protocol.decode_rows, protocol.encode_rows([(1, 'ann', 2.5, None, b'x')])),
+])
+def test_truncated_payloads_raise_protocol_error(decode, payload):
+    decode(payload)
+    for cut in range(len(payload)):
+        with pytest.raises(protocol.ProtocolError):
+            decode(payload[:cut])
+
+
+@pytest.mark.parametrize('query, table', [
+    ('UPDATE Users SET Phone = ?', 'users'),
+    ('UPDATE OR IGNORE Users SET Phone = ?', 'users'),
+    ('INSERT OR REPLACE INTO Users (ID) VALUES (?)', 'users'),
+    ('DELETE FROM main.Users WHERE ID = ?', 'users'),
+    ('REPLACE INTO main . Courses VALUES (?)', 'courses'),
+    ('UPDATE "Users" SET Phone = ?', None),
+    ('WITH gone AS (SELECT 1) DELETE FROM Users', None),
+    ('CREATE TABLE Rooms (ID INTEGER)', None),
+])
+def test_written_table(query, table):
+    assert protocol.written_table(query) == table
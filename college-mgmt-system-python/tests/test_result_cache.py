@@ -0,0 +1,53 @@
+# test_result_cache.py
+# A write must clear the server's cached reads of every table it changes, however the statement names them.
+import os
+import socket
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import protocol  # noqa: E402
+
+
+@pytest.fixture
+def query(tmp_path, start_server):
+    db_connection = sqlite3.connect(tmp_path / 'collegeMGMTsystem.db')
+    db_connection.executescript('''
+        CREATE TABLE Users (ID INTEGER PRIMARY KEY, Username TEXT UNIQUE, Phone TEXT);
+        CREATE TABLE PhoneChanges (UserID INTEGER, Phone TEXT);
+        CREATE TRIGGER log_phone AFTER UPDATE OF Phone ON Users
+            BEGIN INSERT INTO PhoneChanges VALUES (new.ID, new.Phone); END;
+        INSERT INTO Users (Username, Phone) VALUES ('ann', '111'), ('bo', '222');
+    ''')
+    db_connection.close()
+    conn = socket.create_connection(('127.0.0.1', start_server(tmp_path)), timeout=5)
+
+    def run(sql, params=()):
+        protocol.send_message(conn, protocol.QUERY, protocol.encode_query(sql, params))
+        msg_type, payload = protocol.recv_message(conn)
+        assert msg_type != protocol.ERROR, bytes(payload)
+        return protocol.decode_rows(payload) if msg_type == protocol.ROWS else None
+
+    yield run
+    conn.close()
+
+
+def test_update_or_ignore_clears_cached_reads(query):
+    assert query('SELECT Phone FROM Users WHERE ID = ?', (1,)) == [('111',)]
+    query('UPDATE OR IGNORE Users SET Phone = ? WHERE ID = ?', ('333', 1))
+    assert query('SELECT Phone FROM Users WHERE ID = ?', (1,)) == [('333',)]
+
+
+def test_schema_qualified_delete_clears_cached_reads(query):
+    assert query('SELECT COUNT(*) FROM Users') == [(2,)]
+    query('DELETE FROM main.Users WHERE ID = ?', (2,))
+    assert query('SELECT COUNT(*) FROM Users') == [(1,)]
+
+
+def test_trigger_writes_clear_cached_reads(query):
+    assert query('SELECT COUNT(*) FROM PhoneChanges') == [(0,)]
+    query('UPDATE Users SET Phone = ? WHERE ID = ?', ('444', 1))
+    assert query('SELECT COUNT(*) FROM PhoneChanges') == [(1,)]
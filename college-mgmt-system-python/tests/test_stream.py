@@ -0,0 +1,56 @@
+# test_stream.py
+# Slow STREAM consumers must not hold up other clients' queries, on either server engine.
+import os
+import socket
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import protocol  # noqa: E402
+
+ROWS = 50000  # several MB per stream, well past what the socket buffers hold
+
+
+@pytest.fixture(params=['threaded', 'async'])
+def server(request, tmp_path, start_server):
+    db_connection = sqlite3.connect(tmp_path / 'collegeMGMTsystem.db')
+    db_connection.execute('CREATE TABLE Numbers (ID INTEGER PRIMARY KEY, Padding TEXT)')
+    db_connection.executemany('INSERT INTO Numbers (Padding) VALUES (?)', [('x' * 100,)] * ROWS)
+    db_connection.commit()
+    db_connection.close()
+    return start_server(tmp_path, '--engine', request.param, '--readers', '1', '--db-workers', '1')
+
+
+def test_paused_streams_do_not_block_queries(server):
+    streams = []
+    try:
+        # more streams than readers, each read for one chunk and then left waiting on the client
+        for _ in range(3):
+            conn = socket.create_connection(('127.0.0.1', server), timeout=5)
+            protocol.send_message(conn, protocol.STREAM, protocol.encode_stream('SELECT * FROM Numbers', (), 100))
+            msg_type, _ = protocol.recv_message(conn)
+            assert msg_type == protocol.ROWS
+            streams.append(conn)
+
+        with socket.create_connection(('127.0.0.1', server), timeout=5) as conn:
+            protocol.send_message(conn, protocol.QUERY, protocol.encode_query('SELECT COUNT(*) FROM Numbers'))
+            msg_type, payload = protocol.recv_message(conn)
+        assert msg_type == protocol.ROWS
+        assert protocol.decode_rows(payload) == [(ROWS,)]
+
+        # and the paused streams still run to the end once their clients read again
+        for conn in streams:
+            rows = 1
+            while True:
+                msg_type, payload = protocol.recv_message(conn)
+                if msg_type == protocol.DONE:
+                    break
+                assert msg_type == protocol.ROWS
+                rows += 1
+            assert rows == ROWS // 100
+    finally:
+        for conn in streams:
+            conn.close()
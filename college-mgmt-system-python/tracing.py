@@ -0,0 +1,140 @@
+# tracing.py
+# Opt-in timing spans for the client, exported as Chrome trace-event JSON.
+#
+# Set CMS_TRACE=trace.json before starting the client (or call tracing.enable()) and every Database method,
+# page constructor and page method records a span, with send_query split into its cache / connect / send /
+# server / decode phases. Spans nest per thread, so a flame view shows which page called which query and
+# where its time went. Open the file in chrome://tracing or https://ui.perfetto.dev. While tracing is off,
+# span() hands back one shared no-op object, so instrumented code only pays for a flag check.
+import atexit
+import functools
+import os
+import threading
+import time
+
+enabled = False
+events = []
+lock = threading.Lock()
+thread_names = {}  # thread id -> name, emitted as metadata so the viewer labels each row
+origin = time.perf_counter()
+CO_GENERATOR = 0x20  # inspect.CO_GENERATOR; inspect itself is too slow to import at client startup
+
+
+class Span:
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name: str, category: str, args: dict) -> None:
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    # attach extra details (bytes, reused socket, ...) that show up when the span is selected in the viewer
+    def note(self, **args) -> None:
+        self.args.update(args)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        end = time.perf_counter()
+        thread = threading.current_thread()
+        event = {'name': self.name, 'cat': self.category, 'ph': 'X', 'pid': os.getpid(), 'tid': thread.ident,
+                 'ts': (self.start - origin) * 1e6, 'dur': (end - self.start) * 1e6}
+        if exc_type is not None:
+            self.args['error'] = f"{exc_type.__name__}: {exc_value}"
+        if self.args:
+            event['args'] = self.args
+        with lock:
+            events.append(event)
+            thread_names.setdefault(thread.ident, thread.name)
+        return False
+
+
+class NoSpan:
+    def note(self, **args) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+
+NO_SPAN = NoSpan()
+
+
+# Purpose: time a block: `with tracing.span('send', bytes=n):`
+def span(name: str, category: str = 'client', **args):
+    if not enabled:
+        return NO_SPAN
+    return Span(name, category, args)
+
+
+# Purpose: class decorator that wraps __init__ and every other method defined on the class in a span
+# named Class.method, so callers and callees nest in the trace
+def traced(category: str):
+    def decorate(cls):
+        for attr, value in list(vars(cls).items()):
+            if not callable(value) or isinstance(value, (type, staticmethod, classmethod)):
+                continue
+            if attr.startswith('__') and attr != '__init__':
+                continue
+            method = attr.replace(f'_{cls.__name__}__', '__')  # show private methods by their source name
+            setattr(cls, attr, wrap(value, f'{cls.__name__}.{method}', category))
+        return cls
+    return decorate
+
+
+def wrap(function, name: str, category: str):
+    if function.__code__.co_flags & CO_GENERATOR:
+        # the span covers the whole iteration, not just creating the generator
+        @functools.wraps(function)
+        def traced_iteration(*args, **kwargs):
+            if not enabled:
+                return (yield from function(*args, **kwargs))
+            with Span(name, category, {}):
+                return (yield from function(*args, **kwargs))
+        return traced_iteration
+
+    @functools.wraps(function)
+    def traced_call(*args, **kwargs):
+        if not enabled:
+            return function(*args, **kwargs)
+        with Span(name, category, {}):
+            return function(*args, **kwargs)
+    return traced_call
+
+
+# Purpose: start recording; with a path, the trace is also written there when the process exits
+def enable(path: str = None) -> None:
+    global enabled
+    enabled = True
+    if path:
+        atexit.register(export, path)
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def reset() -> None:
+    with lock:
+        events.clear()
+
+
+# Purpose: write everything recorded so far as a Chrome trace-event file
+def export(path: str) -> None:
+    import json
+    with lock:
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                 for tid, name in thread_names.items()] + list(events)
+    with open(path, 'w') as trace_file:
+        json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, trace_file)
+
+
+if os.environ.get('CMS_TRACE'):
+    enable(os.environ['CMS_TRACE'])